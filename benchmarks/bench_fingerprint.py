@@ -0,0 +1,62 @@
+"""Fingerprint benchmark for bo_video_tagger.
+
+Times fingerprint_video() against a full SHA256 (sha256_file, the strict mode)
+on large files. Without --file, random files of --size-mb are written to a
+temporary directory. Files are read once before timing, so both sides run from
+the page cache; on a cold cache or network share the gap is wider still.
+
+    python benchmarks/bench_fingerprint.py [--size-mb 1024] [--repeat 3] [--file VIDEO ...]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bo_video_tagger import fingerprint_video, sha256_file  # noqa: E402
+
+def write_random_file(path: str, size_mb: int):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for i in range(size_mb):
+            # Vary each block so no two ranges hash alike
+            f.write(i.to_bytes(8, "little") + block[8:])
+
+def median_time(fn, path: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024, help="Size of each generated file (default: 1024)")
+    parser.add_argument("--count", type=int, default=1, help="Generated files (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per file (default: 3)")
+    parser.add_argument("--file", nargs="+", help="Benchmark these files instead of generated ones")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.file
+        if not paths:
+            paths = [os.path.join(tmp, f"bench_{i}.bin") for i in range(args.count)]
+            for path in paths:
+                write_random_file(path, args.size_mb)
+
+        print(f"{'file':<24} {'size MB':>9} {'sampled ms':>11} {'full ms':>9} {'speedup':>8}")
+        for path in paths:
+            sha256_file(path) # Warm the page cache
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            sampled = median_time(fingerprint_video, path, args.repeat)
+            full = median_time(sha256_file, path, args.repeat)
+            print(f"{os.path.basename(path)[:24]:<24} {size_mb:9.0f} {sampled * 1000:11.2f} "
+                  f"{full * 1000:9.0f} {full / sampled:7.0f}x")
+
+if __name__ == "__main__":
+    main()
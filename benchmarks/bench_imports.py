@@ -0,0 +1,64 @@
+"""Import-time benchmark for bo_video_tagger.
+
+Imports the module in fresh interpreters under `python -X importtime`, reports
+the median cost and the slowest imports, times `--help`, and exits non-zero if a
+heavy dependency is imported at module load.
+
+    python benchmarks/bench_imports.py [--repeat 5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO_DIR, "bo_video_tagger.py")
+HEAVY_MODULES = ("cv2", "numpy", "yake", "llama_cpp", "huggingface_hub", "psutil", "tqdm")
+
+def import_profile() -> dict:
+    """Returns {module: (self_us, cumulative_us)} for one `import bo_video_tagger`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bo_video_tagger"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+def time_help() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, SCRIPT, "--help"], capture_output=True, check=True)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default: 10)")
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.repeat)]
+    totals = [p["bo_video_tagger"][1] for p in profiles]
+    print(f"import bo_video_tagger: median {statistics.median(totals) / 1000:.1f} ms "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f}, n={args.repeat})")
+
+    print("\nSlowest imports (self time, last run):")
+    for name, (self_us, cumulative_us) in sorted(profiles[-1].items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  (cumulative {cumulative_us / 1000:8.2f} ms)  {name}")
+
+    help_times = [time_help() for _ in range(args.repeat)]
+    print(f"\nbo_video_tagger.py --help: median {statistics.median(help_times) * 1000:.0f} ms wall clock")
+
+    leaked = sorted({name.split(".")[0] for name in profiles[-1]} & set(HEAVY_MODULES))
+    if leaked:
+        print(f"\nFAIL: heavy modules imported at load time: {', '.join(leaked)}")
+        sys.exit(1)
+    print("\nOK: no heavy modules imported at load time.")
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,86 @@
+from __future__ import annotations
+
+import abc
 import hashlib
+import heapq
+import io
 import os
 __version__ = "2.0.0"
 import sys
 import json
 import time
+import queue
+import threading
 import argparse
 import logging
-import psutil
-import cv2
+import multiprocessing
 import re
+import shutil
+import sqlite3
+import tempfile
 import textwrap
-import base64
-import numpy as np
-import yake
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
-from huggingface_hub import hf_hub_download
-from llama_cpp import Llama
-from llama_cpp.llama_chat_format import Llava15ChatHandler
-from tqdm import tqdm
+import weakref
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, BinaryIO, Callable, Iterable, Iterator, Optional
+
+# Heavy dependencies (cv2, numpy, yake, llama_cpp, huggingface_hub, psutil, tqdm) are
+# imported where they are used, so --help and argument errors return instantly.
+if TYPE_CHECKING:
+    import asyncio
+
+    import numpy as np
+    from llama_cpp import Llama
 
 # --- Configuration Constants ---
 REPO_ID = "ggml-org/SmolVLM2-500M-Video-Instruct-GGUF"
+# Llava 1.5 chat format, as rendered by llama_cpp's Llava15ChatHandler
+SYSTEM_MESSAGE = (
+    "A chat between a curious human and an artificial intelligence assistant.  "
+    "The assistant gives helpful, detailed, and polite answers to the human's questions."
+)
+# Simplified Prompt (Focused on Description)
+DEFAULT_PROMPT = (
+    "Describe the content of this video in detail. "
+    "Focus on technical terms, objects present in the scene, and actions being performed."
+)
+DESCRIPTION_KEY = "description" # Answer name of DEFAULT_PROMPT; --ask names must differ
 CONTEXT_SIZE = 8192
-DEFAULT_DEBUG_DIR = "debug_frames"
+DEFAULT_SERVER_PORT = 8765
+MIN_THREADS_PER_ENGINE = 4 # A 500M model gains little from more threads; spare cores go to extra engines
+SEEK_MIN_GAP = 30 # Frames; shorter hops are cheaper to decode forward than to seek
+SAMPLING_STRATEGIES = ("interval", "spread", "scene")
+SCENE_PROBES_PER_SEC = 2 # Detector sampling rate for --strategy scene
+SCENE_MAX_PROBES = 300 # Caps detector cost on long videos
+SCENE_THRESHOLD = 0.3 # Bhattacharyya distance that counts as a cut
+THUMB_WIDTH = 160 # Frame checks run on a strided view about this wide
+BLANK_VAR_THRESHOLD = 10 # Below this variance a frame is black/empty
+UNIFORM_STD_THRESHOLD = 4.0 # Per-channel std below this is a solid colour
+BLUR_THRESHOLD = 10.0 # Laplacian variance below this is too blurry to describe
+REPLACEMENT_TRIES = 3 # Nearby frames tried (half a second apart) when a sample is rejected
+DEDUP_THRESHOLD = 5 # Max dHash Hamming distance (of 64 bits) for two frames to count as duplicates
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
 CACHE_DIR = os.path.expanduser("~/.cache/bo_video_tagger/models")
+VERIFIED_STAMP_SUFFIX = ".verified"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024 # Large reads keep network filesystems streaming
+RESULTS_DB = os.path.join(os.path.dirname(CACHE_DIR), "results.sqlite3")
+RESULT_CACHE_VERSION = 1 # Bump when frame selection or answer parsing changes, to invalidate cached results
+FINGERPRINT_CHUNK = 256 * 1024 # Bytes hashed per sampled range
+FINGERPRINT_SAMPLES = 4 # Evenly spaced middle ranges, besides head and tail
+FINGERPRINT_MEMO_SIZE = 1024 # Fingerprints remembered per tagger (by path, size and mtime)
+FRAMES_DIR = os.path.join(os.path.dirname(CACHE_DIR), "frames")
+FRAME_STORE_MB = 2048 # Default size bound of the frame store; least recently used videos are evicted
+FRAME_STORE_VERSION = 1 # Bump when frame selection changes, to ignore stored frames
+DUPLICATES_DB = os.path.join(os.path.dirname(CACHE_DIR), "duplicates.sqlite3")
+DUPLICATE_BANDS = 4 # dHash split into 16-bit bands; frames within 3 bits always share one
+DUPLICATE_THRESHOLD = 6 # Max dHash Hamming distance for two frames to show the same picture
+DUPLICATE_MIN_MATCH = 0.8 # Share of sampled frames that must match for two videos to be duplicates
+DUPLICATE_MAX_DURATION_DIFF = 1.0 # Seconds
+DUPLICATE_MAX_BAND_MATCHES = 200 # Band values shared by more videos (flat, dark frames) say nothing; skip them
+# meta.path of a successful result line, as written by json.dumps (error results have no path)
+RESULT_PATH_RE = re.compile(rb'^\{"meta": \{"file": "(?:[^"\\]|\\.)*", "path": ("(?:[^"\\]|\\.)*")')
 
 # Setup Logger (Configured in main)
 logger = logging.getLogger("VideoTagger")
@@ -38,6 +94,16 @@ class ModelConfig:
     sha256: str
     mmproj_sha256: str
 
+@dataclass
+class ExtractedVideo:
+    """Frames and metadata of one video, ready for inference."""
+    path: str
+    frames: List[bytes]
+    metadata: Dict[str, Any]
+    stats: Dict[str, Any]
+    extract_time_sec: float
+    error: Optional[str] = None
+
 MODEL_TIERS = {
     "smart": ModelConfig(
         filename="SmolVLM2-500M-Video-Instruct-Q8_0.gguf",
@@ -57,115 +123,762 @@ MODEL_TIERS = {
     )
 }
 
+def sha256_file(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA256 of a file, read in large chunks into one reused buffer."""
+    sha256 = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while n := f.readinto(buffer):
+            sha256.update(view[:n])
+    return sha256.hexdigest()
+
+def fingerprint_video(path: str, strict: bool = False, chunk_size: int = FINGERPRINT_CHUNK,
+                      samples: int = FINGERPRINT_SAMPLES) -> str:
+    """Fast content fingerprint: file size plus SHA256 of a few sampled byte ranges.
+
+    The head and tail (container headers and sample index) and `samples` evenly
+    spaced middle ranges of `chunk_size` bytes are hashed, so a multi-GB video
+    costs a handful of reads. Files too small to sample are hashed whole. With
+    `strict=True` the whole file is hashed, for when sampled ranges are not
+    trusted to tell files apart.
+    """
+    size = os.path.getsize(path)
+    if strict:
+        return f"{size:x}-full-{sha256_file(path)}"
+
+    ranges = samples + 2
+    sha256 = hashlib.sha256(f"{size}:{chunk_size}:{samples}".encode())
+    with open(path, 'rb', buffering=0) as f:
+        if size <= ranges * chunk_size:
+            while data := f.read(HASH_CHUNK_SIZE):
+                sha256.update(data)
+        else:
+            step = (size - chunk_size) / (ranges - 1)
+            for i in range(ranges):
+                f.seek(round(i * step)) # Head at 0, tail at size - chunk_size
+                sha256.update(f.read(chunk_size))
+    return f"{size:x}-{sha256.hexdigest()}"
+
+class ResultCache:
+    """Finished results in SQLite, keyed by VideoTagger.result_key().
+
+    One connection is shared by the pipeline threads; WAL mode lets InferencePool
+    processes read and write the same file concurrently.
+    """
+
+    def __init__(self, path: str = RESULTS_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, result, created) VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time())
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class FrameStore:
+    """Content-addressed store of sampled frames, bounded in size with LRU eviction.
+
+    Frames are kept as lossless PNGs under <root>/<hash[:2]>/<fingerprint>/, named
+    by timestamp and resolution. One manifest per sampling configuration lists a
+    video's frames with its metadata, so a re-run with another prompt, tier or
+    parser skips decoding. Reading a manifest refreshes its mtime, which orders
+    eviction.
+    """
+
+    def __init__(self, root: str = FRAMES_DIR, max_mb: int = FRAME_STORE_MB):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None # Measured on the first write
+
+    def video_dir(self, fingerprint: str) -> str:
+        # Shard on the hash, not the size prefix, so directories fill evenly
+        return os.path.join(self.root, fingerprint.rsplit("-", 1)[-1][:2], fingerprint)
+
+    def load(self, fingerprint: str, sampling: str) -> Optional[tuple[List[np.ndarray], Dict[str, Any], Dict[str, Any]]]:
+        """Returns (frames, metadata, stats) stored for a video and sampling key, or None."""
+        import cv2
+
+        video_dir = self.video_dir(fingerprint)
+        manifest_path = os.path.join(video_dir, f"manifest-{sampling}.json")
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            frames = []
+            for entry in manifest["frames"]:
+                frame = cv2.imread(os.path.join(video_dir, entry["file"]))
+                if frame is None: # Evicted underneath us
+                    return None
+                frames.append(frame)
+            os.utime(manifest_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return frames, manifest["metadata"], manifest["stats"]
+
+    def save(self, fingerprint: str, sampling: str, frames: List[tuple[float, np.ndarray]],
+             metadata: Dict[str, Any], stats: Dict[str, Any]) -> str:
+        """Stores (timestamp_sec, frame) pairs and their manifest; returns the video's directory."""
+        import cv2
+
+        video_dir = self.video_dir(fingerprint)
+        os.makedirs(video_dir, exist_ok=True)
+        entries, written = [], 0
+        for timestamp, frame in frames:
+            h, w = frame.shape[:2]
+            name = f"{round(timestamp * 1000):010d}ms_{w}x{h}.png"
+            path = os.path.join(video_dir, name)
+            if not os.path.exists(path): # Shared with other sampling configurations
+                ok, data = cv2.imencode(".png", frame)
+                if not ok:
+                    raise OSError(f"Could not encode frame {name}")
+                written += self._write(path, data.tobytes())
+            entries.append({"timestamp_sec": round(timestamp, 3), "resolution": f"{w}x{h}", "file": name})
+
+        manifest = json.dumps({"metadata": metadata, "stats": stats, "frames": entries}).encode()
+        written += self._write(os.path.join(video_dir, f"manifest-{sampling}.json"), manifest)
+        self._account(written)
+        return video_dir
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> int:
+        # Readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return len(data)
+
+    def _videos(self) -> List[tuple[float, int, str]]:
+        """(last used, bytes, directory) of every stored video."""
+        videos = []
+        if not os.path.isdir(self.root):
+            return videos
+        for shard in os.scandir(self.root):
+            for video in os.scandir(shard.path) if shard.is_dir() else ():
+                size, used = 0, 0.0
+                for entry in os.scandir(video.path):
+                    st = entry.stat()
+                    size += st.st_size
+                    if entry.name.startswith("manifest-"):
+                        used = max(used, st.st_mtime)
+                videos.append((used, size, video.path))
+        return videos
+
+    def _account(self, written: int):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._videos())
+            else:
+                self._size += written
+            if self._size <= self.max_bytes:
+                return
+
+            # Evict down to 90% so the store is not rescanned on every write
+            videos = sorted(self._videos())
+            self._size = sum(size for _, size, _ in videos)
+            for _, size, path in videos:
+                if self._size <= 0.9 * self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                self._size -= size
+
+class DuplicateIndex:
+    """On-disk index of decoded videos for duplicate detection, updated incrementally run to run.
+
+    Exact copies share a fingerprint. Re-encodes and re-uploads are found through
+    the dHashes of their sampled frames: each hash is split into DUPLICATE_BANDS
+    bands, and only videos sharing a band value are compared frame by frame.
+    Values shared by more than DUPLICATE_MAX_BAND_MATCHES videos (flat or black
+    regions) are skipped, which bounds the work per lookup. Each video records the
+    canonical video whose result it reuses (itself when it was tagged on its own).
+    Paths are stored absolute, since the index outlives the working directory.
+    """
+
+    def __init__(self, path: str = DUPLICATES_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS videos (path TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                "sampling TEXT NOT NULL, duration REAL, hashes TEXT NOT NULL, canonical TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS videos_fingerprint ON videos (fingerprint)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER, value INTEGER, path TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS bands_value ON bands (band, value)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS bands_path ON bands (path)")
+
+    @staticmethod
+    def _bands(frame_hash: int) -> Iterator[tuple[int, int]]:
+        width = 64 // DUPLICATE_BANDS
+        for band in range(DUPLICATE_BANDS):
+            yield band, (frame_hash >> (band * width)) & ((1 << width) - 1)
+
+    @staticmethod
+    def _similar(duration_a: Optional[float], hashes_a: List[int],
+                 duration_b: Optional[float], hashes_b: List[int]) -> bool:
+        if duration_a and duration_b and abs(duration_a - duration_b) > DUPLICATE_MAX_DURATION_DIFF:
+            return False
+        matched = sum(1 for a in hashes_a if any(hamming(a, b) <= DUPLICATE_THRESHOLD for b in hashes_b))
+        return matched >= DUPLICATE_MIN_MATCH * max(len(hashes_a), len(hashes_b))
+
+    def find(self, path: str, fingerprint: str, sampling: str, duration: Optional[float],
+             hashes: List[int]) -> Optional[str]:
+        """Returns the canonical video of an indexed duplicate of `path`, if any.
+
+        `sampling` identifies the frame sampling settings; frames sampled differently are not compared.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._find_copy(path, fingerprint)
+            if row:
+                return row[3]
+
+            keys = []
+            for band, value in {key for frame_hash in hashes for key in self._bands(frame_hash)}:
+                (matches,) = self._db.execute(
+                    "SELECT COUNT(*) FROM (SELECT 1 FROM bands WHERE band = ? AND value = ? LIMIT ?)",
+                    (band, value, DUPLICATE_MAX_BAND_MATCHES + 1)
+                ).fetchone()
+                if matches <= DUPLICATE_MAX_BAND_MATCHES:
+                    keys.append((band, value))
+            if not keys:
+                return None
+
+            # Candidates sharing the most band values first
+            rows = self._db.execute(
+                "SELECT v.duration, v.hashes, v.canonical FROM "
+                "(SELECT path, COUNT(*) AS shared FROM bands WHERE "
+                + " OR ".join(["(band = ? AND value = ?)"] * len(keys)) +
+                " GROUP BY path) AS c JOIN videos AS v ON v.path = c.path "
+                "WHERE v.sampling = ? AND v.path != ? AND v.canonical != ? ORDER BY c.shared DESC, v.path",
+                [*(x for key in keys for x in key), sampling, path, path]
+            ).fetchall()
+        for candidate_duration, candidate_hashes, canonical in rows:
+            if self._similar(duration, hashes, candidate_duration, json.loads(candidate_hashes)):
+                return canonical
+        return None
+
+    def add(self, path: str, fingerprint: str, sampling: str, duration: Optional[float],
+            hashes: List[int], canonical: str):
+        path, canonical = os.path.abspath(path), os.path.abspath(canonical)
+        with self._lock, self._db:
+            self._insert(path, fingerprint, sampling, duration, hashes, canonical)
+
+    def add_copy(self, path: str, fingerprint: str) -> Optional[str]:
+        """Indexes `path` as an exact copy of an indexed video, without its frames.
+
+        Returns the canonical video, or None if no other video has this fingerprint.
+        """
+        path = os.path.abspath(path)
+        with self._lock, self._db:
+            row = self._find_copy(path, fingerprint)
+            if row is None:
+                return None
+            sampling, duration, hashes, canonical = row
+            self._insert(path, fingerprint, sampling, duration, json.loads(hashes), canonical)
+            return canonical
+
+    def _find_copy(self, path: str, fingerprint: str) -> Optional[tuple]:
+        # A row whose canonical is `path` means `path` heads that group; it is not a copy
+        return self._db.execute(
+            "SELECT sampling, duration, hashes, canonical FROM videos "
+            "WHERE fingerprint = ? AND path != ? AND canonical != ? LIMIT 1", (fingerprint, path, path)
+        ).fetchone()
+
+    def _insert(self, path: str, fingerprint: str, sampling: str, duration: Optional[float],
+                hashes: List[int], canonical: str):
+        self._db.execute("DELETE FROM bands WHERE path = ?", (path,))
+        self._db.execute(
+            "INSERT OR REPLACE INTO videos (path, fingerprint, sampling, duration, hashes, canonical, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, fingerprint, sampling, duration, json.dumps(hashes), canonical, time.time())
+        )
+        self._db.executemany(
+            "INSERT INTO bands (band, value, path) VALUES (?, ?, ?)",
+            [(band, value, path) for frame_hash in hashes for band, value in self._bands(frame_hash)]
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def dhash(image: np.ndarray) -> int:
+    """64-bit difference hash: signs of horizontal gradients on a 9x8 grayscale thumbnail."""
+    import cv2
+    import numpy as np
+
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+def _strided_thumb(frame: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    step = max(1, frame.shape[1] // THUMB_WIDTH)
+    return np.ascontiguousarray(frame[::step, ::step])
+
+def frame_sharpness(frame: np.ndarray) -> float:
+    """Laplacian variance of the strided view; ranks blurry frames when none is usable."""
+    import cv2
+
+    gray = cv2.cvtColor(_strided_thumb(frame), cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+def frame_rejection(frame: np.ndarray) -> Optional[str]:
+    """Returns why a frame is not worth sending to the model, or None if it is usable.
+
+    All checks run on a strided view (~THUMB_WIDTH px wide), never the full frame.
+    """
+    import numpy as np
+
+    thumb = _strided_thumb(frame)
+    if np.var(thumb) < BLANK_VAR_THRESHOLD:
+        return "blank"
+    if thumb.reshape(-1, thumb.shape[-1]).std(axis=0).max() < UNIFORM_STD_THRESHOLD:
+        return "uniform"
+    if frame_sharpness(frame) < BLUR_THRESHOLD:
+        return "blurry"
+    return None
+
+class FrameReader:
+    """Random-access frame reader that seeks when the container allows it.
+
+    Seeks are verified against CAP_PROP_POS_FRAMES. The first rejected or
+    misplaced seek disables seeking for the file and the reader falls back to
+    sequential decoding (reopening the capture when it has to move backwards).
+    Skipped frames are only grab()bed; retrieve() (colour conversion to BGR)
+    runs for the requested frames alone.
+    """
+
+    def __init__(self, video_path: str, seek: bool = True):
+        import cv2
+
+        self.video_path = video_path
+        self.seek = seek
+        self.cap = cv2.VideoCapture(video_path)
+        self.position = 0 # Index of the next frame the capture will return
+
+        # Decode accounting (reported per video)
+        self.grabbed = 0
+        self.retrieved = 0
+        self.decode_time = 0.0
+
+    def _reopen(self):
+        import cv2
+
+        self.cap.release()
+        self.cap = cv2.VideoCapture(self.video_path)
+        self.position = 0
+
+    def _disable_seek(self, reason: str):
+        logger.debug(f"Seeking disabled for {os.path.basename(self.video_path)}: {reason}")
+        self.seek = False
+        self._reopen()
+
+    def _grab(self) -> bool:
+        if not self.cap.grab():
+            return False
+        self.grabbed += 1
+        self.position += 1
+        return True
+
+    def read(self, index: int) -> Optional[np.ndarray]:
+        """Returns the frame at `index`, or None once the stream is exhausted."""
+        start = time.perf_counter()
+        try:
+            return self._read(index)
+        finally:
+            self.decode_time += time.perf_counter() - start
+
+    def _read(self, index: int) -> Optional[np.ndarray]:
+        import cv2
+
+        seeked = False
+        if self.seek and (index < self.position or index - self.position > SEEK_MIN_GAP):
+            if self.cap.set(cv2.CAP_PROP_POS_FRAMES, index) and int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)) == index:
+                self.position = index
+                seeked = True
+            else:
+                self._disable_seek(f"seek to frame {index} rejected")
+
+        if index < self.position:
+            self._reopen()
+
+        # Sequential path: demux/decode forward without converting skipped frames
+        while self.position < index:
+            if not self._grab():
+                return None
+
+        if not self._grab():
+            return None
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return None
+        self.retrieved += 1
+
+        # Some containers accept the seek but land on a different frame
+        if seeked and int(self.cap.get(cv2.CAP_PROP_POS_FRAMES)) != index + 1:
+            self._disable_seek(f"seek to frame {index} landed elsewhere")
+            return self._read(index)
+
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "decode_time_sec": round(self.decode_time, 3),
+            "frames_grabbed": self.grabbed,
+            "frames_retrieved": self.retrieved,
+            "decode_mode": "seek" if self.seek else "sequential",
+        }
+
+    def release(self):
+        self.cap.release()
+
+class ModelSource(abc.ABC):
+    """Where model files come from. Subclasses implement open()."""
+
+    def path(self, fname: str) -> Optional[str]:
+        """Returns an existing file that can be used in place, or None if it must be fetched."""
+        return None
+
+    @abc.abstractmethod
+    def open(self, fname: str) -> tuple[BinaryIO, Optional[int]]:
+        """Opens a model file for fetching. Returns the stream and its size if known."""
+
+class _ResponseStream(io.RawIOBase):
+    """Readable file over a streaming HTTP response; closing it ends the request."""
+
+    def __init__(self, chunks: Iterator[bytes], on_close: Callable[[], None]):
+        self._chunks = chunks
+        self._pending = memoryview(b"")
+        self._on_close = on_close
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._on_close()
+        super().close()
+
+class HubSource(ModelSource):
+    """Hugging Face Hub repository. huggingface_hub is only imported when a file is fetched.
+
+    Downloads go through the Hub client's HTTP session, so they get its retries,
+    proxy settings, HF_HUB_OFFLINE handling and HF_HUB_DOWNLOAD_TIMEOUT, and the
+    token is not forwarded when the Hub redirects to its CDN.
+    """
+
+    def __init__(self, repo_id: str = REPO_ID):
+        self.repo_id = repo_id
+
+    def __str__(self) -> str:
+        return self.repo_id
+
+    def open(self, fname: str) -> tuple[BinaryIO, Optional[int]]:
+        from contextlib import ExitStack
+        from huggingface_hub import constants, hf_hub_url
+        from huggingface_hub.utils import build_hf_headers, hf_raise_for_status, http_stream_backoff
+
+        stack = ExitStack()
+        try:
+            response = stack.enter_context(http_stream_backoff(
+                "GET", hf_hub_url(repo_id=self.repo_id, filename=fname),
+                headers=build_hf_headers(), timeout=constants.HF_HUB_DOWNLOAD_TIMEOUT
+            ))
+            hf_raise_for_status(response)
+        except BaseException:
+            stack.close()
+            raise
+        length = response.headers.get("Content-Length")
+        return _ResponseStream(response.iter_bytes(), stack.close), int(length) if length else None
+
+class MirrorSource(ModelSource):
+    """Local directory or shared read-only mirror (e.g. an NFS mount) holding the model files.
+
+    Files are used in place by default; with `in_place=False` they are copied
+    into the cache instead (verified while copying).
+    """
+
+    def __init__(self, root: str, in_place: bool = True):
+        self.root = root
+        self.in_place = in_place
+
+    def __str__(self) -> str:
+        return self.root
+
+    def path(self, fname: str) -> Optional[str]:
+        path = os.path.join(self.root, fname)
+        return path if self.in_place and os.path.isfile(path) else None
+
+    def open(self, fname: str) -> tuple[BinaryIO, Optional[int]]:
+        path = os.path.join(self.root, fname)
+        return open(path, 'rb'), os.path.getsize(path)
+
 class VideoTagger:
-    def __init__(self, tier: str = "smart", debug: bool = False, interval: int = 10, unsafe: bool = False):
+    def __init__(self, tier: str = "smart", debug: bool = False, interval: int = 10, unsafe: bool = False,
+                 seek: bool = True, strategy: str = "interval", dedup_threshold: int = DEDUP_THRESHOLD,
+                 n_threads: Optional[int] = None, reverify: bool = False,
+                 model_source: Optional[ModelSource] = None, questions: Optional[Dict[str, str]] = None,
+                 cache: bool = True, strict_fingerprint: bool = False, find_duplicates: bool = False,
+                 frame_store_mb: int = FRAME_STORE_MB):
         self.interval = interval
+        self.find_duplicates = find_duplicates # Let TaggingPipeline reuse results across duplicate videos
+        self.use_cache = cache
+        self.strict_fingerprint = strict_fingerprint # Hash whole videos instead of sampled ranges
+        self.questions = dict(questions or {}) # Extra prompts answered from the same image state
+        self.model_source = model_source or HubSource()
+        self.reverify = reverify
+        self.n_threads = n_threads # None lets llama.cpp pick
+        self.dedup_threshold = dedup_threshold
+        self.seek = seek
+        self.strategy = strategy
         self.debug = debug
         self.unsafe = unsafe
         self.tier_name = tier
         
         if tier not in MODEL_TIERS:
             raise ValueError(f"Invalid tier: {tier}. Choices: {list(MODEL_TIERS.keys())}")
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Invalid strategy: {strategy}. Choices: {list(SAMPLING_STRATEGIES)}")
+        for name in self.questions:
+            if not name or name == DESCRIPTION_KEY:
+                raise ValueError(f"Invalid question name: {name!r}")
             
         self.config = MODEL_TIERS[tier]
         self.model_dir = CACHE_DIR
-        self.debug_dir = os.path.join(os.getcwd(), DEFAULT_DEBUG_DIR)
+        # Debug mode needs the store to show the frames, even if it was turned off
+        if debug and frame_store_mb <= 0:
+            frame_store_mb = FRAME_STORE_MB
+        self.frame_store = FrameStore(max_mb=frame_store_mb) if frame_store_mb > 0 else None
         
         self.llm: Optional[Llama] = None
-        self.model_path = os.path.join(self.model_dir, self.config.filename)
-        self.mmproj_path = os.path.join(self.model_dir, self.config.mmproj)
+        self.chat_handler = None # Llava15ChatHandler (CLIP projector), created with the engine
+        self._prefix_states: Dict[str, tuple[int, Any]] = {} # Prompt prefix -> (n_tokens, LlamaState)
+        self.result_cache: Optional[ResultCache] = None # Opened on first lookup
+        self.duplicate_index: Optional[DuplicateIndex] = None # Opened by the first pipeline that needs it
+        self._cache_lock = threading.Lock()
+        self._fingerprints: OrderedDict[tuple, str] = OrderedDict() # See fingerprint()
+
+        # asyncio facade state (created on first use)
+        self.async_concurrency = 4
+        self._async_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary() # Event loop -> Semaphore
+        self._decode_pool: Optional[ThreadPoolExecutor] = None
+        self._infer_pool: Optional[ThreadPoolExecutor] = None
+        self.model_path = self._resolve_model_file(self.config.filename)
+        self.mmproj_path = self._resolve_model_file(self.config.mmproj)
+
+    def _resolve_model_file(self, fname: str) -> str:
+        """Path the engine loads `fname` from: in place at the source if possible, else the cache."""
+        return self.model_source.path(fname) or os.path.join(self.model_dir, fname)
 
-    def prepare(self):
-        """Downloads models and initializes the inference engine."""
+    def prepare(self, load_engine: bool = True):
+        """Downloads models and initializes the inference engine.
+
+        With `load_engine=False` only the model files are fetched and verified,
+        e.g. before InferencePool workers load their own engines.
+        """
         self._setup_directories()
         self._download_models()
-        self._load_engine()
+        if load_engine:
+            self._load_engine()
 
     def _setup_directories(self):
         os.makedirs(self.model_dir, exist_ok=True)
         if self.debug:
-            os.makedirs(self.debug_dir, exist_ok=True)
-            logger.info(f"🐛 Debug mode ON. Frames: {self.debug_dir}")
+            logger.info(f"🐛 Debug mode ON. Frames: {self.frame_store.root}")
+
+    def _stamp_path(self, path: str) -> str:
+        # Always in the (writable) cache, so files on read-only mirrors get stamps too
+        return os.path.join(self.model_dir, os.path.basename(path) + VERIFIED_STAMP_SUFFIX)
+
+    @staticmethod
+    def _file_identity(path: str) -> Dict[str, Any]:
+        st = os.stat(path)
+        return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+    def _read_stamp(self, path: str, expected_hash: str) -> bool:
+        """True if a verification stamp proves `path` still has `expected_hash`."""
+        try:
+            with open(self._stamp_path(path)) as f:
+                stamp = json.load(f)
+            return stamp == {"sha256": expected_hash, **self._file_identity(path)}
+        except (OSError, ValueError):
+            return False
+
+    def _write_stamp(self, path: str, expected_hash: str):
+        try:
+            with open(self._stamp_path(path), 'w') as f:
+                json.dump({"sha256": expected_hash, **self._file_identity(path)}, f)
+        except OSError as e:
+            logger.warning(f"Could not write verification stamp: {e}")
+
+    def _remove_stamp(self, path: str):
+        if os.path.exists(self._stamp_path(path)):
+            os.remove(self._stamp_path(path))
 
     def _verify_file(self, path: str, expected_hash: str) -> bool:
-        """Verifies SHA256 hash of a file."""
+        """Verifies SHA256 hash of a file.
+
+        A successful check leaves a stamp (size, mtime, inode) next to the file;
+        while the file is unchanged later runs trust the stamp instead of
+        rehashing, unless `reverify` is set.
+        """
         if not os.path.exists(path):
             return False
+
+        if not self.reverify and self._read_stamp(path, expected_hash):
+            logger.info(f"✅ {os.path.basename(path)} unchanged since last verification.")
+            return True
             
         logger.info(f"🔒 Verifying integrity of {os.path.basename(path)}...")
-        sha256 = hashlib.sha256()
+        self._remove_stamp(path)
         try:
-            with open(path, 'rb') as f:
-                while chunk := f.read(65536):
-                    sha256.update(chunk)
-            
-            calculated = sha256.hexdigest()
+            start = time.perf_counter()
+            calculated = sha256_file(path)
+            elapsed = time.perf_counter() - start
+
             if calculated != expected_hash:
                 logger.critical(f"❌ INTEGRITY FAILURE! Hash mismatch for {path}")
                 logger.critical(f"Expected: {expected_hash}")
                 logger.critical(f"Calculated: {calculated}")
                 return False
             
-            logger.info("✅ Hash verified.")
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            logger.info(f"✅ Hash verified: {os.path.basename(path)} "
+                        f"({size_mb:.0f} MB at {size_mb / max(elapsed, 1e-6):.0f} MB/s).")
+            self._write_stamp(path, expected_hash)
             return True
         except Exception as e:
             logger.error(f"Error checking hash: {e}")
             return False
 
+    def _fetch_file(self, fname: str, expected_hash: Optional[str]) -> bool:
+        """Streams a model file from the source into the cache, hashing the bytes as they arrive.
+
+        Data lands in a temporary file next to the destination and is renamed into
+        place only when the hash matches (`expected_hash=None` skips the check), so
+        a partial or tampered download never sits at the final path.
+        """
+        from tqdm import tqdm
+
+        dest = os.path.join(self.model_dir, fname)
+        sha256 = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        src, size = self.model_source.open(fname)
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, prefix=f".{fname}.", suffix=".part")
+        try:
+            with src, os.fdopen(fd, 'wb') as out, \
+                    tqdm(total=size, unit="B", unit_scale=True, desc=fname, leave=False) as bar:
+                while n := src.readinto(buffer):
+                    sha256.update(view[:n])
+                    out.write(view[:n])
+                    bar.update(n)
+                out.flush()
+                os.fsync(out.fileno())
+
+            if expected_hash is not None and sha256.hexdigest() != expected_hash:
+                logger.critical(f"❌ INTEGRITY FAILURE! Hash mismatch for {fname}")
+                logger.critical(f"Expected: {expected_hash}")
+                logger.critical(f"Calculated: {sha256.hexdigest()}")
+                return False
+
+            os.replace(tmp_path, dest)
+            if expected_hash is not None:
+                self._write_stamp(dest, expected_hash)
+            return True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def _download_models(self):
-        """Ensures both model and projector exist and match SHA256."""
+        """Ensures both model and projector exist and match SHA256.
+
+        Files the source provides in place (MirrorSource) are only verified;
+        anything else is fetched into the cache.
+        """
+        files = [
+            (self.model_path, self.config.filename, self.config.sha256),
+            (self.mmproj_path, self.config.mmproj, self.config.mmproj_sha256)
+        ]
         if self.unsafe:
             logger.warning("⚠️  SKIPPING INTEGRITY CHECKS (Unsafe Mode)")
             # In unsafe mode, just ensure files exist, do not verify hash or delete
             try:
-                for fname in [self.config.filename, self.config.mmproj]:
-                     hf_hub_download(
-                        repo_id=REPO_ID,
-                        filename=fname,
-                        local_dir=self.model_dir,
-                        local_dir_use_symlinks=False
-                    )
+                for path, fname, _ in files:
+                    if not os.path.exists(path):
+                        self._fetch_file(fname, None)
             except Exception:
                  logger.exception("Download failed even in unsafe mode.")
                  sys.exit(1)
             return
 
-        # 1. Check if files exist and are valid
-        valid_model = self._verify_file(self.model_path, self.config.sha256)
-        valid_proj = self._verify_file(self.mmproj_path, self.config.mmproj_sha256)
+        # 1. Check if files exist and are valid (both hashed concurrently; hashlib releases the GIL)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            checks = [pool.submit(self._verify_file, path, expected_hash) for path, _, expected_hash in files]
+            valid = [check.result() for check in checks]
         
-        if valid_model and valid_proj:
+        if all(valid):
             return
 
-        # 2. Delete invalid files if they exist
-        if os.path.exists(self.model_path) and not valid_model:
-            logger.warning("Found corrupted model. Deleting...")
-            os.remove(self.model_path)
-            
-        if os.path.exists(self.mmproj_path) and not valid_proj:
-            logger.warning("Found corrupted projector. Deleting...")
-            os.remove(self.mmproj_path)
+        # 2. Delete invalid files if they exist (never touch the source itself)
+        for (path, fname, _), ok in zip(files, valid):
+            if ok or not os.path.exists(path):
+                continue
+            if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.model_dir):
+                logger.critical(f"❌ SECURITY ALERT: {path} on model source {self.model_source} is corrupted. Aborting.")
+                sys.exit(1)
+            logger.warning(f"Found corrupted {fname}. Deleting...")
+            os.remove(path)
 
-        # 3. Download
-        logger.info(f"⬇️  Downloading {self.tier_name.upper()} model files from {REPO_ID}...")
+        # 3. Download (verified while streaming)
+        logger.info(f"⬇️  Downloading {self.tier_name.upper()} model files from {self.model_source}...")
         try:
-            for fname, expected_hash in [
-                (self.config.filename, self.config.sha256), 
-                (self.config.mmproj, self.config.mmproj_sha256)
-            ]:
-                path = os.path.join(self.model_dir, fname)
-                if not os.path.exists(path):
-                    hf_hub_download(
-                        repo_id=REPO_ID,
-                        filename=fname,
-                        local_dir=self.model_dir,
-                        local_dir_use_symlinks=False
-                    )
-                    # Verify immediately after download
-                    if not self._verify_file(path, expected_hash):
-                        logger.critical("❌ SECURITY ALERT: Downloaded file hash mismatch. Aborting.")
-                        os.remove(path)
-                        sys.exit(1)
+            for path, fname, expected_hash in files:
+                if not os.path.exists(path) and not self._fetch_file(fname, expected_hash):
+                    logger.critical("❌ SECURITY ALERT: Downloaded file hash mismatch. Aborting.")
+                    sys.exit(1)
 
             logger.info("✅ Download and verification complete.")
         except Exception as e:
@@ -174,33 +887,86 @@ class VideoTagger:
 
     def _load_engine(self):
         """Loads Llama with Vision Handler."""
+        from llama_cpp import Llama
+        from llama_cpp.llama_chat_format import Llava15ChatHandler
+
         logger.info(f"🤖 Loading {self.tier_name.upper()} Engine (Vision Enabled)...")
         try:
-            chat_handler = Llava15ChatHandler(clip_model_path=self.mmproj_path)
+            self.chat_handler = Llava15ChatHandler(clip_model_path=self.mmproj_path)
             self.llm = Llama(
                 model_path=self.model_path,
-                chat_handler=chat_handler,
+                chat_handler=self.chat_handler,
                 n_ctx=CONTEXT_SIZE,
                 n_gpu_layers=-1, # Auto-offload
+                n_threads=self.n_threads,
+                n_threads_batch=self.n_threads,
                 verbose=False
             )
+            # The handler would only set up its projector on the first chat call
+            self.chat_handler._init_mtmd_context(self.llm)
+            self._prefix_states.clear()
         except Exception as e:
             logger.exception("Failed to initialize Inference Engine.")
             sys.exit(1)
 
-    def extract_frames(self, video_path: str, max_frames: int = 5) -> tuple[List[str], Dict[str, Any]]:
-        cap = cv2.VideoCapture(video_path)
+    def extract_frames(self, video_path: str, max_frames: int = 5,
+                       stats: Optional[Dict[str, Any]] = None) -> tuple[List[bytes], Dict[str, Any]]:
+        """Samples up to `max_frames` frames as 384x384 BMP bytes.
+
+        When `stats` is given it is filled with decode accounting for the video.
+        """
+        images, metadata = self.decode_frames(video_path, max_frames, stats)
+        return self.encode_frames(images), metadata
+
+    def encode_frames(self, images: List[np.ndarray]) -> List[bytes]:
+        """Encodes frames for the projector.
+
+        BMP is a header plus the raw pixels, so encoding is a copy and the
+        projector reads it back without a decompression pass.
+        """
+        import cv2
+
+        return [cv2.imencode('.bmp', image)[1].tobytes() for image in images]
+
+    def decode_frames(self, video_path: str, max_frames: int = 5,
+                      stats: Optional[Dict[str, Any]] = None) -> tuple[List[np.ndarray], Dict[str, Any]]:
+        """Samples up to `max_frames` usable, distinct frames resized to 384x384 (BGR).
+
+        Frames already in the frame store for this video and sampling are read back instead of decoded.
+        """
+        import cv2
+
+        fingerprint = sampling = None
+        if self.frame_store is not None:
+            start_time = time.time()
+            try:
+                fingerprint = self.fingerprint(video_path)
+            except OSError:
+                pass # Unreadable; let the reader report it
+            sampling = self._sampling_key(max_frames)
+            stored = self.frame_store.load(fingerprint, sampling) if fingerprint else None
+            if stored is not None:
+                frames, metadata, stored_stats = stored
+                if stats is not None:
+                    stats.update(stored_stats)
+                    stats.update(decode_time_sec=round(time.time() - start_time, 3), frames_grabbed=0,
+                                 frames_retrieved=0, decode_mode="frame_store")
+                return frames, metadata
+
         metadata = {"duration_sec": 0, "resolution": "unknown", "fps": 0, "frame_count": 0}
+        reader = FrameReader(video_path, seek=self.seek)
         
-        if not cap.isOpened():
+        if not reader.cap.isOpened():
             logger.warning(f"Could not open video: {video_path}")
+            reader.release()
             return [], metadata
 
+        fps, total_frames = 0, 0
         try:
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = reader.cap.get(cv2.CAP_PROP_FPS)
+            w = int(reader.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            h = int(reader.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            total_frames = int(reader.cap.get(cv2.CAP_PROP_FRAME_COUNT))
             
             metadata["fps"] = round(fps, 2)
             metadata["resolution"] = f"{w}x{h}"
@@ -209,39 +975,187 @@ class VideoTagger:
         except Exception as e:
             logger.warning(f"Metadata extraction warning: {e}")
 
-        # Fallback to 30fps if metadata is broken
-        frame_interval = int(fps * self.interval) if fps > 0 else 300 
-        
-        base64_frames = []
-        count = 0
-        extracted_count = 0
-        
-        while cap.isOpened() and len(base64_frames) < max_frames:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if count % frame_interval == 0:
-                # Validation: Skip empty/black frames
-                if np.var(frame) < 10:
-                    count += 1
-                    continue
+        # Streams without a frame count cannot be seeked reliably
+        if total_frames <= 0:
+            reader.seek = False
 
+        frames: List[np.ndarray] = []
+        timestamps: List[float] = []
+        frame_hashes: List[int] = []
+        rejected: Counter = Counter()
+        duplicates = 0
+        decode_stats: Dict[str, Any] = {}
+
+        try:
+            for index, frame in self._sample_frames(reader, fps, total_frames, max_frames, rejected):
                 resized = cv2.resize(frame, (384, 384))
-                
+
+                # Near-duplicates would only add image tokens without new information
+                frame_hash = dhash(resized)
+                if self.dedup_threshold > 0 and any(
+                    hamming(frame_hash, seen) <= self.dedup_threshold for seen in frame_hashes
+                ):
+                    duplicates += 1
+                    continue
+                frame_hashes.append(frame_hash)
+
+                frames.append(resized)
+                timestamps.append(index / fps if fps > 0 else float(index))
+                # Stop before the generator decodes a frame that would be dropped
+                if len(frames) >= max_frames:
+                    break
+        finally:
+            reader.release()
+            decode_stats = {**reader.stats(), "frames_deduplicated": duplicates, "frames_rejected": sum(rejected.values())}
+            if stats is not None:
+                stats.update(decode_stats)
+            if rejected:
+                logger.debug(f"Rejected frames in {os.path.basename(video_path)}: {dict(rejected)}")
+
+        if fingerprint and frames:
+            try:
+                video_dir = self.frame_store.save(fingerprint, sampling, list(zip(timestamps, frames)), metadata, decode_stats)
                 if self.debug:
-                    debug_name = f"{os.path.basename(video_path)}_{extracted_count}.jpg"
-                    cv2.imwrite(os.path.join(self.debug_dir, debug_name), resized)
+                    logger.info(f"🐛 Frames for {os.path.basename(video_path)}: {video_dir}")
+            except OSError as e:
+                logger.warning(f"Could not store frames of {os.path.basename(video_path)}: {e}")
 
-                _, buffer = cv2.imencode('.jpg', resized, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
-                b64_str = base64.b64encode(buffer).decode('utf-8')
-                base64_frames.append(f"data:image/jpeg;base64,{b64_str}")
-                extracted_count += 1
-            
-            count += 1
-            
-        cap.release()
-        return base64_frames, metadata
+        return frames, metadata
+
+    def _sampling_key(self, max_frames: int = 5) -> str:
+        """Identifies the frame selection settings, so stored frames are only reused for the same ones."""
+        params = {
+            "version": FRAME_STORE_VERSION,
+            "strategy": self.strategy,
+            "interval": self.interval,
+            "dedup_threshold": self.dedup_threshold,
+            "max_frames": max_frames
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _sample_frames(self, reader: FrameReader, fps: float, total_frames: int, max_frames: int,
+                       rejected: Counter) -> Iterator[tuple[int, np.ndarray]]:
+        """Yields usable (index, frame) pairs in ascending order for the configured strategy.
+
+        A rejected sample (see frame_rejection) is replaced by the first usable frame
+        among the next REPLACEMENT_TRIES, half a second apart, that still falls
+        before the following sample. Rejection reasons are counted in `rejected`.
+        If nothing passes because everything is blurry (e.g. smooth animation the
+        blur check dislikes), the sharpest of those frames is used rather than
+        failing the video; blank or uniform frames are never used.
+        """
+        if self.strategy == "scene":
+            yield from self._scene_frames(reader, fps, total_frames, max_frames, rejected)
+            return
+
+        offset = max(1, int(fps / 2)) if fps > 0 else 15
+        indices = self._candidate_indices(fps, total_frames, max_frames)
+        index = next(indices, None)
+        fallback: Optional[tuple[float, int, np.ndarray]] = None # Sharpest blurry (score, index, frame)
+        found = False
+        while index is not None:
+            next_index = next(indices, None)
+            limit = next_index if next_index is not None else total_frames
+            for probe in range(index, index + offset * REPLACEMENT_TRIES + 1, offset):
+                if limit > 0 and probe >= limit:
+                    break
+                # Only the sampled indices are decoded when the reader can seek
+                frame = reader.read(probe)
+                if frame is None:
+                    next_index = None
+                    break
+                reason = frame_rejection(frame)
+                if reason is None:
+                    found = True
+                    yield probe, frame
+                    break
+                rejected[reason] += 1
+                if not found and reason == "blurry":
+                    fallback = self._sharper(fallback, probe, frame)
+            index = next_index
+
+        if not found and fallback is not None:
+            logger.debug(f"No usable frames in {os.path.basename(reader.video_path)}; using the sharpest blurry one")
+            yield fallback[1], fallback[2]
+
+    @staticmethod
+    def _sharper(fallback: Optional[tuple[float, int, np.ndarray]], index: int,
+                 frame: np.ndarray) -> tuple[float, int, np.ndarray]:
+        score = frame_sharpness(frame)
+        return (score, index, frame) if fallback is None or score > fallback[0] else fallback
+
+    def _scene_frames(self, reader: FrameReader, fps: float, total_frames: int, max_frames: int,
+                      rejected: Counter) -> List[tuple[int, np.ndarray]]:
+        """Picks the frames that open the `max_frames` strongest scene changes.
+
+        Probes a few frames per second (skipped frames are only grabbed), compares
+        hue/saturation histograms of 64x36 thumbnails and keeps the full-resolution
+        probes with the largest distance to their predecessor. The first frame
+        always counts as a scene start; unusable probes are never picked, so the
+        next probe of the same scene takes their place. If no probe is usable, the
+        sharpest blurry one is returned; blank or uniform probes never are.
+        """
+        import cv2
+
+        step = max(1, int(fps / SCENE_PROBES_PER_SEC) if fps > 0 else 15)
+        if total_frames > 0:
+            step = max(step, total_frames // SCENE_MAX_PROBES)
+
+        best: List[tuple[float, int, np.ndarray]] = [] # Min-heap of (score, index, frame)
+        prev_hist = None
+        pending: Optional[float] = None # Score of a cut that landed on an unusable frame
+        fallback: Optional[tuple[float, int, np.ndarray]] = None # Sharpest blurry probe
+        index = 0
+        while total_frames <= 0 or index < total_frames:
+            frame = reader.read(index)
+            if frame is None:
+                break
+
+            thumb = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+            hsv = cv2.cvtColor(thumb, cv2.COLOR_BGR2HSV)
+            hist = cv2.calcHist([hsv], [0, 1], None, [16, 16], [0, 180, 0, 256])
+            cv2.normalize(hist, hist)
+
+            score = 1.0 if prev_hist is None else cv2.compareHist(prev_hist, hist, cv2.HISTCMP_BHATTACHARYYA)
+            prev_hist = hist
+
+            if score >= SCENE_THRESHOLD or pending is not None:
+                # A cut that lands on an unusable frame carries its score to the next probe
+                score = max(score, pending or 0.0)
+                reason = frame_rejection(frame)
+                if reason is not None:
+                    rejected[reason] += 1
+                    if not best and reason == "blurry":
+                        fallback = self._sharper(fallback, index, frame)
+                    pending = score
+                    index += step
+                    continue
+                pending = None
+                if len(best) < max_frames:
+                    heapq.heappush(best, (score, index, frame))
+                elif score > best[0][0]:
+                    heapq.heapreplace(best, (score, index, frame))
+
+            index += step
+
+        if not best and fallback is not None:
+            return [(fallback[1], fallback[2])]
+        return sorted(((index, frame) for _, index, frame in best), key=lambda item: item[0])
+
+    def _candidate_indices(self, fps: float, total_frames: int, max_frames: int) -> Iterator[int]:
+        """Yields frame indices to sample, in ascending order, for the configured strategy."""
+        if self.strategy == "spread" and total_frames > 0:
+            # Centre of each of max_frames equal slices of the whole duration
+            for i in range(max_frames):
+                yield int((i + 0.5) * total_frames / max_frames)
+            return
+
+        # Fallback to 30fps if metadata is broken
+        frame_interval = int(fps * self.interval) if fps > 0 else 300
+        index = 0
+        while total_frames <= 0 or index < total_frames:
+            yield index
+            index += max(frame_interval, 1)
 
     def _parse_ai_response(self, text: str) -> Dict[str, Any]:
         """Robustly parses the AI output using YAKE-First Strategy."""
@@ -265,6 +1179,8 @@ class VideoTagger:
 
     def _extract_yake_tags(self, text: str) -> List[str]:
         """Extracts significant keywords using YAKE (Unsupervised Statistical Learning)."""
+        import yake
+
         try:
             # Init YAKE: English, max n-gram=2 (e.g. "Workload Domain")
             # dedupLim=0.3 -> STRICT deduplication to avoid "Video" vs "Video Tutorial"
@@ -278,64 +1194,849 @@ class VideoTagger:
             logger.warning(f"YAKE extraction failed: {e}")
             return ["untagged", "error"]
 
-    def process_video(self, video_path: str) -> Dict[str, Any]:
-        """Runs the VLM on a single video file."""
+    def load_video(self, video_path: str) -> ExtractedVideo:
+        """Extracts frames and metadata. Does not touch the engine, so it is safe to run in worker threads."""
+        start_time = time.time()
+        stats: Dict[str, Any] = {}
+        try:
+            frames, vid_meta = self.extract_frames(video_path, stats=stats)
+            error = None if frames else "No valid frames extracted"
+        except Exception as e:
+            logger.exception(f"Error processing {video_path}")
+            frames, vid_meta, error = [], {}, str(e)
+        return ExtractedVideo(video_path, frames, vid_meta, stats, time.time() - start_time, error)
+
+    def process_video(self, video_path: str, extracted: Optional[ExtractedVideo] = None) -> Dict[str, Any]:
+        """Runs the VLM on a single video file.
+
+        `extracted` takes the output of load_video() when frames were decoded ahead of time.
+        """
         if not self.llm:
             raise RuntimeError("Engine not loaded. Call prepare() first.")
 
+        key, cached = self.lookup_result(video_path)
+        if cached is not None:
+            return cached
+
+        if extracted is None:
+            extracted = self.load_video(video_path)
+        if extracted.error:
+            return self._error_result(video_path, extracted.error)
+
+        try:
+            answers, infer_stats = self.describe_frames(extracted.frames)
+            result = self.build_result(extracted, answers, infer_stats)
+        except Exception as e:
+            logger.exception(f"Error processing {video_path}")
+            return self._error_result(video_path, str(e))
+        self.store_result(key, result)
+        return result
+
+    def fingerprint(self, video_path: str) -> str:
+        """fingerprint_video() of a file, memoised by path, size and mtime.
+
+        The result cache, frame store and duplicate index all key on it, so a video
+        (even with strict fingerprints) is only read for it once.
+        """
+        st = os.stat(video_path)
+        key = (os.path.abspath(video_path), st.st_size, st.st_mtime_ns)
+        with self._cache_lock:
+            if key in self._fingerprints:
+                self._fingerprints.move_to_end(key)
+                return self._fingerprints[key]
+        fingerprint = fingerprint_video(video_path, strict=self.strict_fingerprint)
+        with self._cache_lock:
+            self._fingerprints[key] = fingerprint
+            if len(self._fingerprints) > FINGERPRINT_MEMO_SIZE:
+                self._fingerprints.popitem(last=False)
+        return fingerprint
+
+    # --- Result cache ---
+    def result_key(self, video_path: str) -> str:
+        """Cache key: video fingerprint plus everything that shapes the answer (model, prompts, sampling)."""
+        params = {
+            "version": RESULT_CACHE_VERSION,
+            "video": self.fingerprint(video_path),
+            "model": self.config.sha256,
+            "mmproj": self.config.mmproj_sha256,
+            "system": SYSTEM_MESSAGE,
+            "prompt": DEFAULT_PROMPT,
+            "questions": self.questions,
+            "interval": self.interval,
+            "strategy": self.strategy,
+            "dedup_threshold": self.dedup_threshold
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def lookup_result(self, video_path: str) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Returns (cache key, cached result or None). The key is None when caching is off or the file is unreadable."""
+        if not self.use_cache:
+            return None, None
+        try:
+            key = self.result_key(video_path)
+        except OSError:
+            return None, None # Decoding will report the error
+        with self._cache_lock:
+            if self.result_cache is None:
+                self.result_cache = ResultCache()
+        result = self.result_cache.get(key)
+        if result is None:
+            return key, None
+
+        # Same content may have moved or been renamed since it was tagged
+        result["meta"].update(file=os.path.basename(video_path), path=video_path)
+        result["system"]["cache_hit"] = True
+        return key, result
+
+    def store_result(self, key: Optional[str], result: Dict[str, Any]):
+        if key is not None and self.result_cache is not None and "error" not in result:
+            self.result_cache.put(key, result)
+
+    def describe_frames(self, frames: List[bytes]) -> tuple[Dict[str, str], Dict[str, Any]]:
+        """Runs the engine on encoded frames. Returns the raw answers by name and inference stats.
+
+        The description prompt is laid out as constant text (system message + question)
+        followed by the images, so the llama state after the constant part is saved once
+        and restored for every later video; only image and answer tokens are evaluated.
+
+        With extra `questions` the images come first instead: they are evaluated once,
+        the state after them is snapshotted, and every prompt (the description included)
+        is answered from that snapshot.
+        """
         start_time = time.time()
+        if not self.questions:
+            cached = self._load_prefix(f"{SYSTEM_MESSAGE}\nUSER: {DEFAULT_PROMPT}\n")
+            for frame in frames:
+                self._eval_image(frame)
+            self._eval_text("\nASSISTANT: ")
+            n_prompt = self.llm.n_tokens
+            answers = {DESCRIPTION_KEY: self._generate()}
+        else:
+            cached = self._load_prefix(f"{SYSTEM_MESSAGE}\nUSER: ")
+            for frame in frames:
+                self._eval_image(frame)
+            snapshot = self.llm.save_state()
+            n_prompt, answers = 0, {}
+            for i, (name, prompt) in enumerate({DESCRIPTION_KEY: DEFAULT_PROMPT, **self.questions}.items()):
+                if i:
+                    self.llm.load_state(snapshot)
+                    cached += snapshot.n_tokens
+                self._eval_text(f"{prompt}\nASSISTANT: ")
+                n_prompt += self.llm.n_tokens
+                answers[name] = self._generate()
+
+        return answers, {
+            "inference_time_sec": round(time.time() - start_time, 2),
+            "prompt_tokens": n_prompt,
+            "prompt_tokens_cached": cached
+        }
+
+    def _generate(self) -> str:
+        # Prompt tokens are taken from the engine itself, so only the last one is re-evaluated
+        response = self.llm.create_completion(
+            prompt=self.llm.input_ids[:self.llm.n_tokens].tolist(),
+            max_tokens=512, # Increased for detailed desc + tags
+            temperature=0.5, # Lower temp for strict formatting
+            repeat_penalty=1.1
+        )
+        return response['choices'][0]['text']
+
+    # --- Engine primitives (mirror Llava15ChatHandler's prompt evaluation) ---
+    def _load_prefix(self, text: str) -> int:
+        """Leaves the engine right after `text`, restoring its saved state if there is one.
+
+        Returns the number of prompt tokens that did not need evaluating.
+        """
+        if text in self._prefix_states:
+            n_tokens, state = self._prefix_states[text]
+            self.llm.load_state(state)
+            return n_tokens
+
+        self.llm.reset()
+        self._eval_text(text)
+        self._prefix_states[text] = (self.llm.n_tokens, self.llm.save_state())
+        return 0
+
+    def _eval_text(self, text: str):
+        tokens = self.llm.tokenize(text.encode("utf8"), add_bos=False, special=True)
+        if self.llm.n_tokens + len(tokens) > self.llm.n_ctx():
+            raise ValueError(f"Prompt exceeds n_ctx: {self.llm.n_tokens + len(tokens)} > {self.llm.n_ctx()}")
+        self.llm.eval(tokens)
+
+    def _eval_image(self, image: bytes):
+        """Appends an encoded image to the context through the handler's mtmd projector.
+
+        The image marker is tokenized on its own, so the model's image wrapper tokens
+        come along; text chunks go through Llama.eval and image chunks are evaluated
+        by mtmd, as in Llava15ChatHandler.__call__.
+        """
+        import ctypes
+        import llama_cpp
+        from llama_cpp._utils import suppress_stdout_stderr
+
+        handler, llm = self.chat_handler, self.llm
+        handler._init_mtmd_context(llm)
+        mtmd = handler._mtmd_cpp
+        bitmap = handler._create_bitmap_from_bytes(image)
+        chunks = mtmd.mtmd_input_chunks_init()
         try:
-            frames, vid_meta = self.extract_frames(video_path)
-            if not frames:
-                return {"meta": {"file": os.path.basename(video_path)}, "error": "No valid frames extracted"}
+            if chunks is None:
+                raise ValueError("Failed to create input chunks")
+            text = mtmd.mtmd_input_text()
+            text.text = mtmd.mtmd_default_marker()
+            text.add_special = False # Mid-prompt: no BOS
+            text.parse_special = True
+            bitmaps = (mtmd.mtmd_bitmap_p_ctypes * 1)(bitmap)
+            with suppress_stdout_stderr(disable=handler.verbose):
+                result = mtmd.mtmd_tokenize(handler.mtmd_ctx, chunks, ctypes.byref(text), bitmaps, 1)
+            if result != 0:
+                raise ValueError(f"Failed to tokenize image: error code {result}")
 
-            content = [{"type": "image_url", "image_url": {"url": img}} for img in frames]
-            
-            # Simplified Prompt (Focused on Description)
-            prompt_text = (
-                "Describe the content of this video in detail. "
-                "Focus on technical terms, objects present in the scene, and actions being performed."
-            )
-            
-            content.append({
-                "type": "text", 
-                "text": prompt_text
-            })
-
-            response = self.llm.create_chat_completion(
-                messages=[{"role": "user", "content": content}],
-                max_tokens=512, # Increased for detailed desc + tags
-                temperature=0.5, # Lower temp for strict formatting
-                repeat_penalty=1.1
-            )
-            
-            raw_text = response['choices'][0]['message']['content']
-            parsed_ai = self._parse_ai_response(raw_text)
-            
-            # Construct Rich Dictionary
-            return {
-                "meta": {
-                    "file": os.path.basename(video_path),
-                    "path": video_path,
-                    "size_mb": round(os.path.getsize(video_path) / (1024*1024), 2),
-                    **vid_meta
-                },
-                "ai": parsed_ai,
-                "system": {
-                    "model": self.config.filename,
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "processing_time_sec": round(time.time() - start_time, 2)
-                }
+            n_image = mtmd.mtmd_helper_get_n_tokens(chunks)
+            if llm.n_tokens + n_image > llm.n_ctx():
+                raise ValueError(f"Prompt exceeds n_ctx: {llm.n_tokens + n_image} > {llm.n_ctx()}")
+
+            for i in range(mtmd.mtmd_input_chunks_size(chunks)):
+                chunk = mtmd.mtmd_input_chunks_get(chunks, i)
+                if chunk is None:
+                    continue
+                if mtmd.mtmd_input_chunk_get_type(chunk) == mtmd.MTMD_INPUT_CHUNK_TYPE_TEXT:
+                    n_tokens = ctypes.c_size_t()
+                    tokens = mtmd.mtmd_input_chunk_get_tokens_text(chunk, ctypes.byref(n_tokens))
+                    if n_tokens.value:
+                        llm.eval(tokens[:n_tokens.value])
+                    continue
+
+                llm._ctx.kv_cache_seq_rm(-1, llm.n_tokens, -1) # As Llama.eval does
+                n_past = llama_cpp.llama_pos(0)
+                with suppress_stdout_stderr(disable=handler.verbose):
+                    result = mtmd.mtmd_helper_eval_chunk_single(
+                        handler.mtmd_ctx, llm._ctx.ctx, chunk, llama_cpp.llama_pos(llm.n_tokens),
+                        llama_cpp.llama_seq_id(0), llm.n_batch, False, ctypes.byref(n_past)
+                    )
+                if result != 0:
+                    raise ValueError(f"Failed to evaluate image: error code {result}")
+                # Image positions hold no tokens; -1 keeps them from matching a later prompt
+                llm.input_ids[llm.n_tokens:n_past.value] = -1
+                llm.n_tokens = n_past.value
+        finally:
+            if chunks is not None:
+                mtmd.mtmd_input_chunks_free(chunks)
+            mtmd.mtmd_bitmap_free(bitmap)
+
+    def build_result(self, extracted: ExtractedVideo, answers: Dict[str, str], infer_stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Parses the answers and assembles the output record."""
+        parsed_ai = self._parse_ai_response(answers[DESCRIPTION_KEY])
+        extra = {name: text.strip() for name, text in answers.items() if name != DESCRIPTION_KEY}
+        if extra:
+            parsed_ai["answers"] = extra
+        video_path = extracted.path
+
+        # Construct Rich Dictionary
+        return {
+            "meta": {
+                "file": os.path.basename(video_path),
+                "path": video_path,
+                "size_mb": round(os.path.getsize(video_path) / (1024*1024), 2),
+                **extracted.metadata
+            },
+            "ai": parsed_ai,
+            "system": {
+                "model": self.config.filename,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "processing_time_sec": round(extracted.extract_time_sec + infer_stats["inference_time_sec"], 2),
+                "cache_hit": False,
+                **extracted.stats,
+                **infer_stats
             }
+        }
 
-        except Exception as e:
-            logger.exception(f"Error processing {video_path}")
-            return {"meta": {"file": os.path.basename(video_path)}, "error": str(e)}
+    @staticmethod
+    def _error_result(video_path: str, error: str) -> Dict[str, Any]:
+        return {"meta": {"file": os.path.basename(video_path)}, "error": error}
+
+    def duplicate_result(self, extracted: ExtractedVideo, canonical: str, canonical_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Output record for a duplicate video: its own metadata and the canonical video's answers."""
+        if "error" in canonical_result:
+            result = self._error_result(extracted.path, f"Duplicate of {canonical}, which failed: {canonical_result['error']}")
+            result["meta"]["duplicate_of"] = canonical
+            return result
+
+        return {
+            "meta": {
+                "file": os.path.basename(extracted.path),
+                "path": extracted.path,
+                "size_mb": round(os.path.getsize(extracted.path) / (1024*1024), 2),
+                **extracted.metadata,
+                "duplicate_of": canonical
+            },
+            "ai": canonical_result["ai"],
+            "system": {
+                "model": self.config.filename,
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "processing_time_sec": round(extracted.extract_time_sec, 2),
+                "cache_hit": False,
+                **extracted.stats
+            }
+        }
+
+    def process_videos(self, paths: Iterable[str], ordered: bool = True,
+                       **pipeline_kwargs) -> Iterator[Any]:
+        """Tags videos from any iterable of paths (it may be unbounded), yielding results lazily.
+
+        Decoding, inference and parsing overlap through a TaggingPipeline
+        (`pipeline_kwargs` sets its worker counts and queue size). With
+        `ordered=True` results come back in input order; otherwise
+        (input index, result) pairs are yielded as soon as each video is done.
+        Stopping iteration early stops the pipeline.
+        """
+        results = TaggingPipeline(self, **pipeline_kwargs).run_indexed(paths)
+        if not ordered:
+            yield from results
+            return
+
+        with closing(results):
+            waiting: Dict[int, Dict[str, Any]] = {}
+            next_index = 0
+            for index, result in results:
+                waiting[index] = result
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+
+    # --- asyncio API ---
+    def _async_executors(self) -> tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+        if self._decode_pool is None:
+            self._decode_pool = ThreadPoolExecutor(max_workers=self.async_concurrency, thread_name_prefix="decode")
+            # Single thread: the engine is not thread-safe
+            self._infer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+        return self._decode_pool, self._infer_pool
+
+    def _async_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        # A semaphore is bound to the loop it was first awaited on, so each loop gets its own
+        import asyncio
+
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots.setdefault(loop, asyncio.Semaphore(self.async_concurrency))
+        return slots
+
+    async def aprocess_video(self, video_path: str) -> Dict[str, Any]:
+        """Awaitable process_video() that keeps the event loop free.
+
+        Decoding and parsing run in a thread pool, inference on a dedicated engine
+        thread; at most `async_concurrency` videos are in flight. Cancelling the
+        caller abandons the video: queued work is dropped, a step already running
+        finishes in the background.
+        """
+        import asyncio
+
+        if not self.llm:
+            raise RuntimeError("Engine not loaded. Call prepare() first.")
+
+        loop = asyncio.get_running_loop()
+        decode_pool, infer_pool = self._async_executors()
+        async with self._async_semaphore(loop):
+            key, cached = await loop.run_in_executor(decode_pool, self.lookup_result, video_path)
+            if cached is not None:
+                return cached
+            extracted = await loop.run_in_executor(decode_pool, self.load_video, video_path)
+            if extracted.error:
+                return self._error_result(video_path, extracted.error)
+            try:
+                answers, infer_stats = await loop.run_in_executor(infer_pool, self.describe_frames, extracted.frames)
+                result = await loop.run_in_executor(decode_pool, self.build_result, extracted, answers, infer_stats)
+            except Exception as e:
+                logger.exception(f"Error processing {video_path}")
+                return self._error_result(video_path, str(e))
+            await loop.run_in_executor(decode_pool, self.store_result, key, result)
+            return result
+
+    async def aprocess_folder(self, folder: str) -> AsyncIterator[Dict[str, Any]]:
+        """Async iterator over results for the videos in `folder`, in completion order.
+
+        Leaving the loop early (or cancelling it) cancels the videos still in flight.
+        """
+        import asyncio
+
+        # Listing a large or network folder would block the event loop
+        loop = asyncio.get_running_loop()
+        decode_pool, _ = self._async_executors()
+        paths = await loop.run_in_executor(decode_pool, lambda: list(find_videos(folder)))
+
+        pending = set()
+        try:
+            for path in paths:
+                pending.add(asyncio.ensure_future(self.aprocess_video(path)))
+                if len(pending) >= self.async_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        """Shuts down the asyncio API's thread pools and closes the result cache."""
+        for pool in (self._decode_pool, self._infer_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._decode_pool = self._infer_pool = None
+        self._async_slots.clear()
+        if self.result_cache is not None:
+            self.result_cache.close()
+            self.result_cache = None
+        if self.duplicate_index is not None:
+            self.duplicate_index.close()
+            self.duplicate_index = None
+
+@dataclass
+class PipelineJob:
+    """A video travelling through TaggingPipeline; `result` is set once it is done (or failed)."""
+    index: int # Position in the input
+    path: str
+    cache_key: Optional[str] = None
+    duplicate_of: Optional[str] = None # Canonical video whose result this one reuses
+    video: Optional[ExtractedVideo] = None
+    images: List[np.ndarray] = field(default_factory=list)
+    answers: Dict[str, str] = field(default_factory=dict)
+    infer_stats: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+
+class TaggingPipeline:
+    """Streams videos through discover -> decode -> [duplicates] -> encode -> infer -> parse stages.
+
+    Stages run in their own threads and are connected by bounded queues, so
+    decoding, inference and YAKE parsing of different videos overlap. The engine
+    is owned by a single infer thread; run() is the write stage's feed and yields
+    results in completion order.
+
+    With `tagger.find_duplicates` a duplicates stage looks each decoded video up
+    in the DuplicateIndex. Duplicates skip inference and reuse their canonical
+    video's result; if that video is still in flight they are held back until
+    its result comes out.
+    """
+
+    _DONE = object() # End-of-stream marker, one per downstream worker
+
+    def __init__(self, tagger: VideoTagger, decode_workers: int = 2, encode_workers: int = 1,
+                 parse_workers: int = 1, queue_size: int = 2):
+        self.tagger = tagger
+        self.decode_workers = max(1, decode_workers)
+        self.encode_workers = max(1, encode_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.queue_size = max(1, queue_size)
+        self._stop = threading.Event()
+
+        # Duplicates stage state, shared with the output loop
+        self._dup_lock = threading.Lock()
+        self._in_flight: set[str] = set() # Canonical videos being tagged in this run
+        self._held: Dict[str, List[PipelineJob]] = {} # Canonical path -> duplicates waiting for its result
+        self._finished: Dict[str, Dict[str, Any]] = {} # Only used without the result cache
+
+    def run(self, paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yields one result per path, in completion order. Closing the generator stops all stages."""
+        for _, result in self.run_indexed(paths):
+            yield result
+
+    def run_indexed(self, paths: Iterable[str]) -> Iterator[tuple[int, Dict[str, Any]]]:
+        """Like run(), but yields (input index, result) pairs."""
+        if not self.tagger.llm:
+            raise RuntimeError("Engine not loaded. Call prepare() first.")
+
+        self._stop.clear()
+        decode_q = queue.Queue(self.queue_size)
+        duplicate_q = queue.Queue(self.queue_size)
+        encode_q = queue.Queue(self.queue_size)
+        infer_q = queue.Queue(self.queue_size)
+        parse_q = queue.Queue(self.queue_size)
+        out_q = queue.Queue(self.queue_size)
+
+        if self.tagger.find_duplicates:
+            if self.tagger.duplicate_index is None:
+                self.tagger.duplicate_index = DuplicateIndex()
+            decoded = [
+                (self._stage(decode_q, duplicate_q, self._decode, self.decode_workers, 1), self.decode_workers),
+                (self._stage(duplicate_q, encode_q, self._find_duplicate, 1, self.encode_workers), 1),
+            ]
+        else:
+            decoded = [
+                (self._stage(decode_q, encode_q, self._decode, self.decode_workers, self.encode_workers), self.decode_workers),
+            ]
+        stages = [
+            (self._discover(paths, decode_q), 1),
+            *decoded,
+            (self._stage(encode_q, infer_q, self._encode, self.encode_workers, 1), self.encode_workers),
+            (self._stage(infer_q, parse_q, self._infer, 1, self.parse_workers), 1),
+            (self._stage(parse_q, out_q, self._parse, self.parse_workers, 1), self.parse_workers),
+        ]
+        threads = [
+            threading.Thread(target=target, daemon=True)
+            for target, count in stages for _ in range(count)
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            while (item := self._get(out_q)) is not self._DONE:
+                if item is None: # Stopped
+                    return
+                yield item.index, item.result
+                for held in self._release_duplicates(item):
+                    yield held.index, held.result
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+
+    # --- Queue helpers (give up once the pipeline is stopped) ---
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def _discover(self, paths: Iterable[str], out_q: queue.Queue):
+        def target():
+            try:
+                for index, path in enumerate(paths):
+                    if not self._put(out_q, PipelineJob(index, path)):
+                        return
+            except Exception:
+                logger.exception("Video discovery failed; finishing the videos already queued.")
+            for _ in range(self.decode_workers):
+                self._put(out_q, self._DONE)
+        return target
+
+    def _stage(self, in_q: queue.Queue, out_q: queue.Queue, fn: Callable[[PipelineJob], None],
+               workers: int, downstream: int):
+        """Builds a worker loop; the last of `workers` to finish signals `downstream` consumers.
+
+        A stage body returning False holds the job back instead of passing it on.
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def target():
+            while (job := self._get(in_q)) is not self._DONE:
+                if job is None:
+                    return
+                if job.result is None:
+                    try:
+                        if fn(job) is False:
+                            continue
+                    except Exception as e:
+                        logger.exception(f"Error processing {job.path}")
+                        job.result = self.tagger._error_result(job.path, str(e))
+                if not self._put(out_q, job):
+                    return
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                for _ in range(downstream):
+                    self._put(out_q, self._DONE)
+        return target
+
+    # --- Stage bodies ---
+    def _decode(self, job: PipelineJob):
+        job.cache_key, job.result = self.tagger.lookup_result(job.path)
+        if job.result is not None:
+            if self.tagger.find_duplicates:
+                self._mark_copy(job)
+            return
+        start_time = time.time()
+        stats: Dict[str, Any] = {}
+        job.images, metadata = self.tagger.decode_frames(job.path, stats=stats)
+        job.video = ExtractedVideo(job.path, [], metadata, stats, time.time() - start_time)
+        if not job.images:
+            job.result = self.tagger._error_result(job.path, "No valid frames extracted")
+
+    def _mark_copy(self, job: PipelineJob):
+        """A cache hit skips the duplicates stage, but an exact copy shares its canonical's
+        cache key; record it as that video's duplicate."""
+        canonical = self.tagger.duplicate_index.add_copy(os.path.abspath(job.path), self.tagger.fingerprint(job.path))
+        if canonical is not None:
+            job.duplicate_of = canonical
+            job.result["meta"]["duplicate_of"] = canonical
+
+    def _find_duplicate(self, job: PipelineJob) -> Optional[bool]:
+        tagger, index = self.tagger, self.tagger.duplicate_index
+        path = os.path.abspath(job.path) # Canonicals are absolute; relative ones would resolve against the cwd
+        fingerprint = tagger.fingerprint(job.path)
+        sampling = tagger._sampling_key()
+        duration = job.video.metadata.get("duration_sec")
+        hashes = [dhash(image) for image in job.images]
+
+        canonical = index.find(path, fingerprint, sampling, duration, hashes)
+        with self._dup_lock:
+            if canonical is None:
+                held = False
+            elif canonical in self._in_flight:
+                held = True
+            else:
+                canonical_result = self._finished.get(canonical) or tagger.lookup_result(canonical)[1]
+                if canonical_result is None:
+                    canonical = None # Its result is gone; tag this one on its own
+                held = False
+            index.add(path, fingerprint, sampling, duration, hashes, canonical or path)
+
+            job.duplicate_of = canonical
+            if held:
+                job.images = []
+                self._held.setdefault(canonical, []).append(job)
+                return False
+            if canonical is None:
+                self._in_flight.add(path)
+                return None
+        # Not cached: the answers are the canonical's, and the next run must find it again
+        job.result = tagger.duplicate_result(job.video, canonical, canonical_result)
+        return None
+
+    def _release_duplicates(self, job: PipelineJob) -> List[PipelineJob]:
+        """Completes the duplicates held back for `job`, now that its result is out."""
+        if not self.tagger.find_duplicates or job.duplicate_of:
+            return []
+        path = os.path.abspath(job.path)
+        with self._dup_lock:
+            self._in_flight.discard(path)
+            if not self.tagger.use_cache and "error" not in job.result:
+                self._finished[path] = job.result
+            held = self._held.pop(path, [])
+        for duplicate in held:
+            duplicate.result = self.tagger.duplicate_result(duplicate.video, path, job.result)
+        return held
+
+    def _encode(self, job: PipelineJob):
+        start_time = time.time()
+        job.video.frames = self.tagger.encode_frames(job.images)
+        job.video.extract_time_sec += time.time() - start_time
+        job.images = []
+
+    def _infer(self, job: PipelineJob):
+        job.answers, job.infer_stats = self.tagger.describe_frames(job.video.frames)
+        job.video.frames = []
+
+    def _parse(self, job: PipelineJob):
+        job.result = self.tagger.build_result(job.video, job.answers, job.infer_stats)
+        self.tagger.store_result(job.cache_key, job.result)
+
+def find_videos(folder: str) -> Iterator[str]:
+    """Yields the video files directly inside `folder`."""
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(VIDEO_EXTENSIONS) and entry.is_file():
+                yield os.path.join(folder, entry.name)
+
+def serve(tagger: VideoTagger, host: str = "127.0.0.1", port: int = DEFAULT_SERVER_PORT,
+          pipeline_kwargs: Optional[Dict[str, Any]] = None):
+    """Keeps a prepared tagger resident and tags jobs posted over HTTP until interrupted.
+
+    POST /tag with {"paths": [files or folders]} streams back one JSON result per
+    line; GET /health reports the loaded model. Jobs share the engine and run one
+    at a time.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    job_lock = threading.Lock()
+    pipeline_kwargs = pipeline_kwargs or {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} - {format % args}")
+
+        def _send_json(self, status: int, payload: Dict[str, Any]):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send_json(404, {"error": "Not found"})
+            self._send_json(200, {"status": "ok", "version": __version__, "model": tagger.config.filename})
+
+        def do_POST(self):
+            if self.path != "/tag":
+                return self._send_json(404, {"error": "Not found"})
+            try:
+                job = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                paths = job["paths"]
+                if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+                    raise TypeError("paths must be a list of strings")
+            except (ValueError, KeyError, TypeError) as e:
+                return self._send_json(400, {"error": f"Invalid job: {e}"})
+
+            videos = [v for p in paths for v in (find_videos(p) if os.path.isdir(p) else [p])]
+            logger.info(f"📥 Job from {self.address_string()}: {len(videos)} videos")
+
+            # Streamed body: one result per line, connection closes at the end
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            with job_lock, closing(TaggingPipeline(tagger, **pipeline_kwargs).run(videos)) as results:
+                try:
+                    for result in results:
+                        self.wfile.write((json.dumps(result) + "\n").encode())
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.warning("Client disconnected; job cancelled.")
+
+    with ThreadingHTTPServer((host, port), Handler) as server:
+        logger.info(f"🛰️  Serving {tagger.config.filename} on http://{host}:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Server stopped.")
+
+def tag_remote(server_url: str, paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Client side of serve(): submits paths (as seen by the server) and yields results as they stream in."""
+    import urllib.request
+
+    request = urllib.request.Request(
+        server_url.rstrip("/") + "/tag",
+        data=json.dumps({"paths": paths}).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            yield json.loads(line)
+
+# InferencePool control messages on the results queue (results are dicts; None means a clean finish)
+_WORKER_READY = "ready"
+_WORKER_FAILED = "failed"
+
+def _pool_worker(tagger_kwargs: Dict[str, Any], pipeline_kwargs: Dict[str, Any],
+                 tasks: "multiprocessing.Queue", results: "multiprocessing.Queue"):
+    """InferencePool process: loads its own engine and streams tasks through a TaggingPipeline."""
+    logging.basicConfig(
+        level=logging.INFO, 
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
+    failed = True
+    try:
+        tagger = VideoTagger(**tagger_kwargs)
+        tagger._load_engine() # Exits the process if the engine cannot load
+        results.put(_WORKER_READY)
+        for result in TaggingPipeline(tagger, **pipeline_kwargs).run(iter(tasks.get, None)):
+            results.put(result)
+        failed = False
+    except Exception:
+        logger.exception("Inference worker failed.")
+    finally:
+        results.put(_WORKER_FAILED if failed else None)
+
+class InferencePool:
+    """Tags videos with several worker processes, each owning a Llama instance.
+
+    Paths go out through a shared task queue; results come back to the calling
+    process, which stays the single writer. Model files must already be
+    verified (VideoTagger.prepare(load_engine=False)).
+
+    run() raises RuntimeError if no worker manages to load an engine; workers
+    that fail later are counted in `failed_workers`, and the videos they held
+    are missing from the results.
+    """
+
+    def __init__(self, tagger_kwargs: Dict[str, Any], workers: int, threads_per_worker: int,
+                 pipeline_kwargs: Optional[Dict[str, Any]] = None):
+        self.tagger_kwargs = {**tagger_kwargs, "n_threads": threads_per_worker}
+        self.workers = max(1, workers)
+        self.pipeline_kwargs = pipeline_kwargs or {}
+        self.failed_workers = 0
+
+    def run(self, paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yields one result per path, in completion order."""
+        ctx = multiprocessing.get_context("spawn") # Forking a process with llama.cpp threads is unsafe
+        tasks = ctx.Queue(maxsize=self.workers * 4)
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_pool_worker, args=(self.tagger_kwargs, self.pipeline_kwargs, tasks, results), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for p in procs:
+            p.start()
+
+        def feed():
+            for path in paths:
+                tasks.put(path)
+            for _ in procs:
+                tasks.put(None)
+
+        threading.Thread(target=feed, daemon=True).start()
+
+        finished = ready = 0
+        self.failed_workers = 0
+        try:
+            while finished + self.failed_workers < len(procs):
+                try:
+                    result = results.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in procs):
+                        # Killed without a word (e.g. out of memory)
+                        logger.error("Inference workers exited without finishing.")
+                        self.failed_workers = len(procs) - finished
+                        break
+                    continue
+                if result is None:
+                    finished += 1
+                elif result == _WORKER_READY:
+                    ready += 1
+                elif result == _WORKER_FAILED:
+                    self.failed_workers += 1
+                    logger.error(f"An inference worker failed ({self.failed_workers}/{len(procs)}).")
+                else:
+                    yield result
+                if not ready and self.failed_workers == len(procs):
+                    break
+            if not ready and self.failed_workers:
+                raise RuntimeError("No inference engine could be loaded.")
+        finally:
+            for p in procs:
+                if p.is_alive():
+                    p.terminate()
+                p.join()
+
+def plan_workers(tier: str, requested: Optional[int] = None) -> tuple[int, int]:
+    """Sizes the inference pool. Returns (engine processes, threads per engine).
+
+    Unless `requested`, runs as many engines as available RAM allows for the tier
+    (MODEL_TIERS.min_ram_gb each) while giving every engine at least
+    MIN_THREADS_PER_ENGINE physical cores.
+    """
+    import psutil
+
+    cores = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    available_gb = psutil.virtual_memory().available / (1024 ** 3)
+    by_ram = max(1, int(available_gb // MODEL_TIERS[tier].min_ram_gb))
+    by_cpu = max(1, cores // MIN_THREADS_PER_ENGINE)
+    workers = requested or min(by_ram, by_cpu)
+    return workers, max(1, cores // workers)
+
+def check_system_resources(tier: str, engines: int = 1) -> bool:
+    import psutil
 
-def check_system_resources(tier: str) -> bool:
     mem = psutil.virtual_memory()
     available_gb = mem.available / (1024 ** 3)
-    req_gb = MODEL_TIERS[tier].min_ram_gb
+    req_gb = MODEL_TIERS[tier].min_ram_gb * engines
     
     logger.info(f"System Check ({tier.upper()}): {available_gb:.2f}GB Available / {req_gb}GB Required")
     
@@ -346,6 +2047,52 @@ def check_system_resources(tier: str) -> bool:
         return False
     return True
 
+def write_results(results: Iterable[Dict[str, Any]], output_path: str, total: Optional[int] = None):
+    """Appends results to a JSONL file as they arrive."""
+    from tqdm import tqdm
+
+    logger.info(f"💾 Saving results to: {output_path}")
+    with tqdm(total=total, unit="vid") as pbar:
+        # Open in append mode (Line-Delimited JSON)
+        with open(output_path, 'a') as f:
+            for result in results:
+                # O(1) Write
+                f.write(json.dumps(result) + "\n")
+                f.flush() # Ensure it hits disk immediately
+                
+                pbar.set_postfix(file=result["meta"]["file"][:10])
+                pbar.update(1)
+
+    logger.info(f"Done! Results saved to {output_path}")
+
+def scan_completed(output_path: str) -> tuple[set[str], int]:
+    """Returns the absolute meta.path of every successful result in a JSONL output,
+    and the byte length of its complete lines.
+
+    The file is streamed line by line and paths are pulled out with a regex, so
+    multi-GB outputs scan quickly; json.loads is only the fallback. A last line
+    without a newline (cut off by a crash) is not counted.
+    """
+    completed, complete_size = set(), 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            complete_size += len(line)
+            if match := RESULT_PATH_RE.match(line):
+                path = json.loads(match.group(1))
+            else:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict) or "error" in record:
+                    continue
+                path = record.get("meta", {}).get("path")
+            if path:
+                completed.add(os.path.abspath(path))
+    return completed, complete_size
+
 def main():
     # Configure Logging
     logging.basicConfig(
@@ -355,81 +2102,192 @@ def main():
     )
 
     parser = argparse.ArgumentParser(description=f"BO Video Tagger v{__version__}")
-    parser.add_argument("folder", help="Path to video folder")
+    parser.add_argument("folder", nargs="?", help="Path to video folder")
     parser.add_argument("--mode", choices=MODEL_TIERS.keys(), default="smart", help="Processing mode")
     parser.add_argument("--interval", type=int, default=10, help="Frame extraction interval in seconds (default: 10)")
     parser.add_argument("--output", help="Custom output directory or filename")
-    parser.add_argument("--debug", action="store_true", help="Save debug frames")
+    parser.add_argument("--debug", action="store_true", help="Log where each video's frames are kept in the frame store")
     parser.add_argument("--unsafe", action="store_true", help="DISABLE security checks (Model Integrity)")
+    parser.add_argument("--model-mirror", default=os.environ.get("BO_VIDEO_TAGGER_MODELS"),
+                        help="Directory or read-only share holding the model files, used instead of Hugging Face "
+                             "(default: $BO_VIDEO_TAGGER_MODELS)")
+    parser.add_argument("--mirror-copy", action="store_true", help="Copy model files from --model-mirror into the cache instead of using them in place")
+    parser.add_argument("--reverify", action="store_true", help="Re-hash model files even if they are unchanged since the last check")
+    parser.add_argument("--strategy", choices=SAMPLING_STRATEGIES, default="interval",
+                        help="Frame sampling: every --interval seconds, spread evenly over the whole video, "
+                             "or at the strongest scene changes")
+    parser.add_argument("--dedup-threshold", type=int, default=DEDUP_THRESHOLD,
+                        help=f"Drop frames within this many dHash bits of an earlier one; 0 disables (default: {DEDUP_THRESHOLD})")
+    parser.add_argument("--prefetch", type=int, default=2,
+                        help="Videos buffered between pipeline stages (default: 2)")
+    parser.add_argument("--decode-workers", type=int, default=2, help="Frame decoding threads (default: 2)")
+    parser.add_argument("--encode-workers", type=int, default=1, help="Frame encoding threads (default: 1)")
+    parser.add_argument("--parse-workers", type=int, default=1, help="Answer parsing (YAKE) threads (default: 1)")
+    parser.add_argument("--workers", default="1",
+                        help="Inference processes, each with its own engine, or 'auto' to size from RAM/CPU (default: 1)")
+    parser.add_argument("--no-seek", action="store_true", help="Decode sequentially instead of seeking to sampled frames")
+    parser.add_argument("--serve", action="store_true", help="Keep the engine loaded and accept jobs over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Address for --serve (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVER_PORT, help=f"Port for --serve (default: {DEFAULT_SERVER_PORT})")
+    parser.add_argument("--server", help="Send the folder to a running --serve instance (e.g. http://127.0.0.1:8765)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Append to an existing output (--output file, or the newest one for this folder) and skip videos it already has")
+    parser.add_argument("--no-cache", action="store_true", help="Re-tag every video instead of reusing cached results")
+    parser.add_argument("--strict-fingerprint", action="store_true",
+                        help="Identify videos by a full SHA256 instead of sampled byte ranges (slow on large files)")
+    parser.add_argument("--frame-store-mb", type=int, default=FRAME_STORE_MB,
+                        help=f"Size bound of the decoded-frame store, 0 disables it (default: {FRAME_STORE_MB})")
+    parser.add_argument("--find-duplicates", action="store_true",
+                        help="Tag each group of duplicate videos (copies, re-encodes) once and reuse the result")
+    parser.add_argument("--ask", action="append", default=[], metavar="NAME=PROMPT",
+                        help="Extra prompt answered from the same frames, stored under ai.answers.NAME (repeatable)")
     args = parser.parse_args()
 
     # Early Validation
-    if not os.path.exists(args.folder):
+    if args.serve:
+        if args.folder:
+            parser.error("--serve does not take a folder; submit jobs with --server")
+    elif not args.folder:
+        parser.error("the following arguments are required: folder")
+    elif not os.path.exists(args.folder):
         logger.error(f"Directory not found: {args.folder}")
         sys.exit(1)
 
+    if args.server:
+        # These configure the local engine and pipeline; the server uses its own
+        ignored = [
+            f"--{dest.replace('_', '-')}" for dest in (
+                "mode", "interval", "strategy", "dedup_threshold", "ask", "no_cache", "strict_fingerprint",
+                "find_duplicates", "frame_store_mb", "no_seek", "workers", "prefetch", "decode_workers",
+                "encode_workers", "parse_workers", "unsafe", "reverify", "debug"
+            ) if getattr(args, dest) != parser.get_default(dest)
+        ]
+        if ignored:
+            parser.error(f"--server uses the server's settings; set {', '.join(ignored)} on the --serve instance instead")
+
+    questions = {}
+    for ask in args.ask:
+        name, sep, prompt = ask.partition("=")
+        name, prompt = name.strip(), prompt.strip()
+        if not sep or not name or not prompt or name == DESCRIPTION_KEY or name in questions:
+            parser.error(f"invalid --ask {ask!r}: expected a unique NAME=PROMPT (NAME other than '{DESCRIPTION_KEY}')")
+        questions[name] = prompt
+
+    pipeline_kwargs = dict(
+        decode_workers=args.decode_workers,
+        encode_workers=args.encode_workers,
+        parse_workers=args.parse_workers,
+        queue_size=args.prefetch
+    )
+    tagger_kwargs = dict(
+        tier=args.mode, debug=args.debug, interval=args.interval, unsafe=args.unsafe, reverify=args.reverify,
+        model_source=MirrorSource(args.model_mirror, in_place=not args.mirror_copy) if args.model_mirror else None,
+        seek=not args.no_seek, strategy=args.strategy, dedup_threshold=args.dedup_threshold,
+        questions=questions, cache=not args.no_cache, strict_fingerprint=args.strict_fingerprint,
+        find_duplicates=args.find_duplicates, frame_store_mb=args.frame_store_mb
+    )
+
+    if args.serve:
+        if not check_system_resources(args.mode):
+            logger.error("Aborted due to system requirements.")
+            sys.exit(1)
+        tagger = VideoTagger(**tagger_kwargs)
+        tagger.prepare()
+        serve(tagger, args.host, args.port, pipeline_kwargs)
+        return
+
     # Determine Output Path (Early Validation)
     timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
     folder_name = os.path.basename(os.path.normpath(args.folder))
     default_filename = f"{folder_name}_video_tags_{timestamp}.jsonl"
 
-    if args.output:
-        if os.path.isdir(args.output):
-            output_path = os.path.join(args.output, default_filename)
-        else:
-            output_path = args.output
-            
+    if args.output and not os.path.isdir(args.output):
+        output_path = args.output
+
         # SECURITY: Exact extension check
         if not output_path.endswith(".jsonl"):
             logger.critical("⛔ SECURITY ERROR: Output file must have .jsonl extension.")
             logger.critical(f"Provided path: {output_path}")
             sys.exit(1)
     else:
-        output_path = default_filename
+        output_dir = args.output or ""
+        output_path = os.path.join(output_dir, default_filename)
+        if args.resume:
+            # Timestamped names sort chronologically
+            previous = sorted(
+                name for name in os.listdir(output_dir or ".")
+                if name.startswith(f"{folder_name}_video_tags_") and name.endswith(".jsonl")
+            )
+            if previous:
+                output_path = os.path.join(output_dir, previous[-1])
+
+    completed: set[str] = set()
+    if args.resume and os.path.isfile(output_path):
+        completed, complete_size = scan_completed(output_path)
+        if complete_size < os.path.getsize(output_path):
+            logger.warning(f"✂️  Dropping a truncated last line from {output_path}")
+            with open(output_path, 'r+b') as f:
+                f.truncate(complete_size)
+        logger.info(f"⏩ Resuming {output_path}: {len(completed)} videos already tagged")
+
+    if args.server:
+        # Thin client: the server already holds a loaded engine
+        video_files = [os.path.abspath(v) for v in find_videos(args.folder)]
+        video_files = [v for v in video_files if v not in completed]
+        if not video_files:
+            logger.warning("No video files left to tag." if completed else "No video files found.")
+            sys.exit(0)
+        logger.info(f"📤 Sending {len(video_files)} videos to {args.server}")
+        write_results(tag_remote(args.server, video_files), output_path, len(video_files))
+        return
+
+    if args.workers == "auto":
+        workers, threads_per_worker = plan_workers(args.mode)
+    elif args.workers.isdigit() and int(args.workers) > 0:
+        workers, threads_per_worker = plan_workers(args.mode, int(args.workers))
+    else:
+        logger.error(f"--workers must be a positive integer or 'auto', got: {args.workers}")
+        sys.exit(1)
 
-    if not check_system_resources(args.mode):
+    if not check_system_resources(args.mode, workers):
         logger.error("Aborted due to system requirements.")
         sys.exit(1)
 
     if args.unsafe:
         logger.warning("⚠️  UNSAFE MODE ENABLED: Skipping integrity checks!")
 
-    # Initialize Tagger
-    tagger = VideoTagger(tier=args.mode, debug=args.debug, interval=args.interval, unsafe=args.unsafe)
-    tagger.prepare()
+    # Initialize Tagger (pool workers load their own engines)
+    tagger = VideoTagger(**tagger_kwargs)
+    tagger.prepare(load_engine=workers == 1)
 
     # Find Videos
-    valid_exts = ('.mp4', '.mov', '.avi', '.mkv', '.webm')
-    video_files = [
-        os.path.join(args.folder, f) for f in os.listdir(args.folder) 
-        if f.lower().endswith(valid_exts)
-    ]
+    video_files = [v for v in find_videos(args.folder) if os.path.abspath(v) not in completed]
     
     if not video_files:
-        logger.warning("No video files found.")
+        logger.warning("No video files left to tag." if completed else "No video files found.")
         sys.exit(0)
 
     logger.info(f"Processing {len(video_files)} videos...")
 
+    # Process Loop (discover -> decode -> encode -> infer -> parse run concurrently; this thread writes)
+    if workers > 1:
+        logger.info(f"🧵 Running {workers} engines x {threads_per_worker} threads")
+        pool = InferencePool(tagger_kwargs, workers, threads_per_worker, pipeline_kwargs)
+        results = pool.run(video_files)
+    else:
+        pool = None
+        results = tagger.process_videos(video_files, **pipeline_kwargs)
 
+    try:
+        write_results(results, output_path, len(video_files))
+    except RuntimeError as e:
+        logger.error(f"❌ {e}")
+        sys.exit(1)
 
-    logger.info(f"💾 Saving results to: {output_path}")
-    
-    # Process Loop
-    with tqdm(total=len(video_files), unit="vid") as pbar:
-        # Open in append mode (Line-Delimited JSON)
-        with open(output_path, 'a') as f:
-            for vid in video_files:
-                result = tagger.process_video(vid)
-                
-                # O(1) Write
-                f.write(json.dumps(result) + "\n")
-                f.flush() # Ensure it hits disk immediately
-                
-                pbar.set_postfix(file=os.path.basename(vid)[:10])
-                pbar.update(1)
-
-    logger.info(f"Done! Results saved to {output_path}")
+    if pool is not None and pool.failed_workers:
+        logger.error(f"❌ {pool.failed_workers} inference worker(s) failed; their videos are missing from {output_path}. "
+                     "Re-run with --resume to tag them.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
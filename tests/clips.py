@@ -0,0 +1,40 @@
+"""Synthetic test clips written with cv2.VideoWriter."""
+from typing import List, Sequence
+
+import cv2
+import numpy as np
+
+SIZE = (160, 120) # (width, height)
+FPS = 10
+
+def textured_frame(seed: int, brightness: int = 0) -> np.ndarray:
+    """A frame with coarse random structure (stable dHash) and fine texture (passes the blur check)."""
+    rng = np.random.default_rng(seed)
+    coarse = cv2.resize(rng.integers(0, 200, (6, 8, 3), dtype=np.uint8), SIZE, interpolation=cv2.INTER_CUBIC)
+    texture = rng.integers(0, 40, (SIZE[1], SIZE[0], 1))
+    return np.clip(coarse + texture + brightness, 0, 255).astype(np.uint8)
+
+def solid_frame(value: int) -> np.ndarray:
+    return np.full((SIZE[1], SIZE[0], 3), value, np.uint8)
+
+def write_clip(path: str, frames: Sequence[np.ndarray], fps: int = FPS):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, SIZE)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not write {path}")
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+def scene_clip(path: str, seeds: Sequence[int], seconds: float = 1.0, brightness: int = 0, fps: int = FPS) -> List[int]:
+    """Writes one scene per seed, each a still `seconds` long; returns each scene's first frame index."""
+    frames, starts = [], []
+    for seed in seeds:
+        starts.append(len(frames))
+        frames += [textured_frame(seed, brightness)] * int(seconds * fps)
+    write_clip(path, frames, fps)
+    return starts
+
+def gradient_frame() -> np.ndarray:
+    """Smooth horizontal ramp: varied enough to not be blank, too smooth to pass the blur check."""
+    ramp = np.linspace(0, 255, SIZE[0]).astype(np.uint8)
+    return np.ascontiguousarray(np.broadcast_to(ramp[None, :, None], (SIZE[1], SIZE[0], 3)))
@@ -0,0 +1,111 @@
+"""Tests for DuplicateIndex.
+
+    python -m unittest discover -s tests
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import bo_video_tagger  # noqa: E402
+from bo_video_tagger import DuplicateIndex  # noqa: E402
+
+SAMPLING = "interval-10-5"
+
+def frame_hashes(seed: int, count: int = 5) -> list:
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+def reencoded(hashes: list) -> list:
+    # A couple of bits off per frame, well within DUPLICATE_THRESHOLD
+    return [h ^ (1 << 3) ^ (1 << 40) for h in hashes]
+
+class DuplicateIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = DuplicateIndex(os.path.join(self.tmp.name, "duplicates.db"))
+        self.hashes = frame_hashes(1)
+        self.index.add("/videos/a.mp4", "fp-a", SAMPLING, 60.0, self.hashes, "/videos/a.mp4")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def test_empty_index(self):
+        index = DuplicateIndex(os.path.join(self.tmp.name, "empty.db"))
+        self.assertIsNone(index.find("/videos/a.mp4", "fp-a", SAMPLING, 60.0, self.hashes))
+        index.close()
+
+    def test_finds_reencode(self):
+        found = self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.4, reencoded(self.hashes))
+        self.assertEqual(found, "/videos/a.mp4")
+
+    def test_not_its_own_duplicate(self):
+        self.assertIsNone(self.index.find("/videos/a.mp4", "fp-a", SAMPLING, 60.0, self.hashes))
+
+    def test_ignores_other_sampling(self):
+        self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", "scene-27-5", 60.0, reencoded(self.hashes)))
+
+    def test_ignores_other_duration(self):
+        self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 90.0, reencoded(self.hashes)))
+
+    def test_ignores_different_video(self):
+        self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, frame_hashes(2)))
+
+    def test_partial_match_below_minimum(self):
+        hashes = reencoded(self.hashes)[:3] + frame_hashes(2)[:2] # 3/5 < DUPLICATE_MIN_MATCH
+        self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, hashes))
+
+    def test_exact_copy(self):
+        # Found by fingerprint alone, whatever the frames
+        self.assertEqual(self.index.find("/videos/copy.mp4", "fp-a", "scene-27-5", None, []), "/videos/a.mp4")
+        self.assertEqual(self.index.add_copy("/videos/copy.mp4", "fp-a"), "/videos/a.mp4")
+        found = self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, reencoded(self.hashes))
+        self.assertEqual(found, "/videos/a.mp4")
+
+    def test_add_copy_without_original(self):
+        self.assertIsNone(self.index.add_copy("/videos/b.mp4", "fp-b"))
+        self.assertIsNone(self.index.find("/videos/c.mp4", "fp-b", SAMPLING, None, []))
+
+    def test_duplicates_point_at_canonical(self):
+        self.index.add("/videos/b.mp4", "fp-b", SAMPLING, 60.0, reencoded(self.hashes), "/videos/a.mp4")
+        found = self.index.find("/videos/c.mp4", "fp-c", SAMPLING, 60.0, reencoded(reencoded(self.hashes)))
+        self.assertEqual(found, "/videos/a.mp4")
+        # a heads its group, so its own duplicates do not make it one
+        self.assertIsNone(self.index.find("/videos/a.mp4", "fp-a", SAMPLING, 60.0, self.hashes))
+
+    def test_readd_replaces_hashes(self):
+        self.index.add("/videos/a.mp4", "fp-a", SAMPLING, 60.0, frame_hashes(3), "/videos/a.mp4")
+        self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, reencoded(self.hashes)))
+
+    def test_relative_paths_stored_absolute(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        w1, w2 = (os.path.realpath(os.path.join(self.tmp.name, name)) for name in ("w1", "w2"))
+        os.makedirs(w1)
+        os.makedirs(w2)
+        os.chdir(w1)
+        self.index.add("vids/a.avi", "fp-w1", SAMPLING, 60.0, frame_hashes(4), "vids/a.avi")
+        os.chdir(w2)
+        self.index.add("vids/a.avi", "fp-w2", SAMPLING, 60.0, frame_hashes(5), "vids/a.avi")
+        self.assertEqual(self.index.add_copy("vids/a_copy.avi", "fp-w1"), os.path.join(w1, "vids", "a.avi"))
+        os.chdir(w1)
+        found = self.index.find("vids/b.avi", "fp-b", SAMPLING, 60.0, reencoded(frame_hashes(4)))
+        self.assertEqual(found, os.path.join(w1, "vids", "a.avi"))
+        self.assertIsNone(self.index.find("vids/a.avi", "fp-w1", SAMPLING, 60.0, frame_hashes(4)))
+
+    def test_skips_common_band_values(self):
+        for i in range(3):
+            self.index.add(f"/videos/flat{i}.mp4", f"fp-flat{i}", SAMPLING, 60.0, [0] * 5, f"/videos/flat{i}.mp4")
+        with mock.patch.object(bo_video_tagger, "DUPLICATE_MAX_BAND_MATCHES", 2):
+            self.assertIsNone(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, [0] * 5))
+            found = self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, reencoded(self.hashes))
+            self.assertEqual(found, "/videos/a.mp4")
+        self.assertEqual(self.index.find("/videos/b.mp4", "fp-b", SAMPLING, 60.0, [0] * 5), "/videos/flat0.mp4")
+
+if __name__ == "__main__":
+    unittest.main()
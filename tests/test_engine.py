@@ -0,0 +1,124 @@
+"""Smoke tests for the engine primitives against the pinned llama-cpp-python.
+
+VideoTagger evaluates images through Llava15ChatHandler's internals, which change
+between llama-cpp-python releases. Both tests run whenever the pinned version is
+installed; the end-to-end one uses tiny random models unless pointed at real ones:
+
+    BO_VIDEO_TAGGER_MODELS=/path/to/models python -m unittest discover -s tests
+"""
+import ast
+import inspect
+import os
+import re
+import sys
+import tempfile
+import textwrap
+import unittest
+from importlib import metadata, util
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bo_video_tagger import DESCRIPTION_KEY, MODEL_TIERS, MirrorSource, VideoTagger  # noqa: E402
+import tiny_models  # noqa: E402
+
+def pinned_version() -> str:
+    with open(os.path.join(REPO_DIR, "requirements.txt")) as f:
+        return re.search(r"^llama-cpp-python==(\S+)", f.read(), re.M).group(1)
+
+def installed_version() -> str:
+    try:
+        return metadata.version("llama-cpp-python")
+    except metadata.PackageNotFoundError:
+        return ""
+
+PINNED = pinned_version()
+requires_pinned = unittest.skipUnless(installed_version() == PINNED, f"needs llama-cpp-python=={PINNED}")
+
+def attributes_used(method, *owners: str) -> set:
+    """(owner, attribute) pairs read off `handler`, `mtmd`, `llama_cpp` or `self.chat_handler` in a method."""
+    tree = ast.parse(textwrap.dedent(inspect.getsource(method)))
+    used = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Attribute):
+            continue
+        value = node.value
+        if isinstance(value, ast.Name) and value.id in owners:
+            used.add((value.id, node.attr))
+        elif isinstance(value, ast.Attribute) and value.attr == "chat_handler":
+            used.add(("handler", node.attr))
+    return used
+
+@requires_pinned
+class EngineApiTest(unittest.TestCase):
+    def test_handler_and_mtmd_api(self):
+        import llama_cpp
+        import llama_cpp.mtmd_cpp as mtmd_cpp
+        from llama_cpp.llama_chat_format import Llava15ChatHandler
+
+        with tempfile.NamedTemporaryFile() as clip:
+            handler = Llava15ChatHandler(clip_model_path=clip.name, verbose=False)
+        owners = {"handler": handler, "mtmd": mtmd_cpp, "llama_cpp": llama_cpp}
+        used = attributes_used(VideoTagger._eval_image, *owners) | attributes_used(VideoTagger._load_engine, *owners)
+        missing = sorted(f"{owner}.{attr}" for owner, attr in used if not hasattr(owners[owner], attr))
+        self.assertEqual(missing, [], f"not in llama-cpp-python {PINNED}")
+        self.assertIn(("mtmd", "mtmd_helper_eval_chunk_single"), used)
+
+@requires_pinned
+class EngineSmokeTest(unittest.TestCase):
+    """Runs describe_frames end to end: on the real models if BO_VIDEO_TAGGER_MODELS
+    points at them, otherwise on tiny random ones (needs the `gguf` package)."""
+
+    @classmethod
+    def setUpClass(cls):
+        config = MODEL_TIERS["smart"]
+        root = os.environ.get("BO_VIDEO_TAGGER_MODELS")
+        cls.real = bool(root)
+        if cls.real:
+            for fname in (config.filename, config.mmproj):
+                if not os.path.isfile(os.path.join(root, fname)):
+                    raise unittest.SkipTest(f"{fname} not in {root}")
+        else:
+            if util.find_spec("gguf") is None:
+                raise unittest.SkipTest("set BO_VIDEO_TAGGER_MODELS or install gguf")
+            cls.tmp = tempfile.TemporaryDirectory()
+            root = cls.tmp.name
+            tiny_models.write_models(root, config.filename, config.mmproj)
+
+        cls.tagger = VideoTagger("smart", model_source=MirrorSource(root), n_threads=os.cpu_count(),
+                                 unsafe=not cls.real, # Tiny models do not match the pinned hashes
+                                 questions={"color": "What is the main color?"}, cache=False, frame_store_mb=0)
+        cls.tagger.prepare()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tagger.close()
+        cls.tagger.llm.close()
+        if not cls.real:
+            cls.tmp.cleanup()
+
+    def frames(self):
+        import numpy as np
+
+        frame = np.zeros((384, 384, 3), np.uint8)
+        frame[:, :192] = (0, 0, 255) # Red and blue halves
+        frame[:, 192:] = (255, 0, 0)
+        return self.tagger.encode_frames([frame, frame[:, ::-1].copy()])
+
+    def test_describe_frames(self):
+        frames = self.frames()
+        for questions in ({"color": "What is the main color?"}, {}):
+            with self.subTest(questions=questions):
+                self.tagger.questions = questions
+                answers, stats = self.tagger.describe_frames(frames)
+                self.assertEqual(set(answers), {DESCRIPTION_KEY, *questions})
+                if self.real:
+                    self.assertTrue(all(answer.strip() for answer in answers.values()))
+                self.assertGreater(stats["prompt_tokens"], 0)
+
+                # The constant prompt prefix is restored on the next video
+                _, stats = self.tagger.describe_frames(frames)
+                self.assertGreater(stats["prompt_tokens_cached"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Tests for fingerprint_video().
+
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bo_video_tagger import fingerprint_video, sha256_file  # noqa: E402
+
+CHUNK = 16
+SAMPLES = 2 # Ranges at 0, 32, 64 and 96 in a 112-byte file
+
+class FingerprintVideoTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "video.mp4")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fingerprint(self, data: bytes, **kwargs) -> str:
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return fingerprint_video(self.path, chunk_size=CHUNK, samples=SAMPLES, **kwargs)
+
+    def flipped(self, data: bytes, offset: int) -> bytes:
+        return data[:offset] + bytes([data[offset] ^ 0xFF]) + data[offset + 1:]
+
+    def test_size_prefix(self):
+        self.assertTrue(self.fingerprint(bytes(112)).startswith(f"{112:x}-"))
+
+    def test_small_file_hashed_whole(self):
+        data = bytes(range(4 * CHUNK)) # Fits in the sampled ranges
+        base = self.fingerprint(data)
+        for offset in range(len(data)):
+            self.assertNotEqual(self.fingerprint(self.flipped(data, offset)), base, offset)
+
+    def test_sampled_ranges(self):
+        data = bytes(range(112))
+        base = self.fingerprint(data)
+        for offset in (0, CHUNK - 1, 32, 64 + CHUNK - 1, 96, 111): # Head, middles and tail
+            self.assertNotEqual(self.fingerprint(self.flipped(data, offset)), base, offset)
+        for offset in (CHUNK, 48, 80): # Between ranges
+            self.assertEqual(self.fingerprint(self.flipped(data, offset)), base, offset)
+
+    def test_size_changes_fingerprint(self):
+        data = bytes(range(112))
+        self.assertNotEqual(self.fingerprint(data + bytes(1)), self.fingerprint(data))
+
+    def test_sampling_settings_change_fingerprint(self):
+        base = self.fingerprint(bytes(range(112)))
+        self.assertNotEqual(fingerprint_video(self.path, chunk_size=8, samples=SAMPLES), base)
+
+    def test_strict_hashes_every_byte(self):
+        data = bytes(range(112))
+        self.assertEqual(self.fingerprint(data, strict=True), f"{112:x}-full-{sha256_file(self.path)}")
+        self.assertNotEqual(self.fingerprint(self.flipped(data, 48), strict=True), self.fingerprint(data, strict=True))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,228 @@
+"""Tests for frame sampling and quality checks, on synthetic clips.
+
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bo_video_tagger import SAMPLING_STRATEGIES, FrameReader, FrameStore, VideoTagger, frame_rejection  # noqa: E402
+from clips import FPS, gradient_frame, scene_clip, solid_frame, textured_frame, write_clip  # noqa: E402
+
+class FrameRejectionTest(unittest.TestCase):
+    def test_reasons(self):
+        self.assertEqual(frame_rejection(solid_frame(0)), "blank")
+        self.assertEqual(frame_rejection(solid_frame(128)), "blank")
+        red = np.zeros_like(solid_frame(0))
+        red[:] = (0, 0, 255)
+        self.assertEqual(frame_rejection(red), "uniform")
+        self.assertEqual(frame_rejection(gradient_frame()), "blurry")
+        self.assertIsNone(frame_rejection(textured_frame(0)))
+
+    def test_full_resolution(self):
+        # Checks run on a strided view, whatever the frame size
+        frame = np.tile(textured_frame(0), (9, 12, 1))
+        self.assertIsNone(frame_rejection(frame))
+        self.assertEqual(frame_rejection(np.zeros_like(frame)), "blank")
+
+class FrameTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def clip(self, name: str, frames) -> str:
+        path = os.path.join(self.tmp.name, name)
+        write_clip(path, frames)
+        return path
+
+    def tagger(self, **kwargs) -> VideoTagger:
+        return VideoTagger(**{"interval": 1, "frame_store_mb": 0, **kwargs})
+
+class QualityFallbackTest(FrameTestCase):
+    def decode(self, path: str) -> dict:
+        return {strategy: self.tagger(strategy=strategy).decode_frames(path)[0] for strategy in SAMPLING_STRATEGIES}
+
+    def test_black_clip_has_no_frames(self):
+        path = self.clip("black.avi", [solid_frame(0)] * (3 * FPS))
+        for strategy, frames in self.decode(path).items():
+            with self.subTest(strategy=strategy):
+                self.assertEqual(frames, [])
+
+    def test_blurry_clip_falls_back_to_one_frame(self):
+        path = self.clip("blurry.avi", [solid_frame(0)] * FPS + [gradient_frame()] * (2 * FPS))
+        for strategy, frames in self.decode(path).items():
+            with self.subTest(strategy=strategy):
+                self.assertEqual(len(frames), 1)
+                self.assertEqual(frame_rejection(frames[0]), "blurry")
+
+    def test_usable_frames_win(self):
+        path = self.clip("mixed.avi", [gradient_frame()] * FPS + [textured_frame(0)] * (2 * FPS))
+        for strategy, frames in self.decode(path).items():
+            with self.subTest(strategy=strategy):
+                self.assertGreaterEqual(len(frames), 1)
+                self.assertTrue(all(frame_rejection(frame) is None for frame in frames))
+
+class RejectingCapture:
+    """Wraps a capture whose container refuses every seek."""
+
+    def __init__(self, cap):
+        self.cap = cap
+
+    def set(self, prop, value):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+class FrameReaderTest(FrameTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp.name, "scenes.avi")
+        scene_clip(self.path, range(12)) # One scene per second
+
+    def reference(self, index: int) -> np.ndarray:
+        reader = FrameReader(self.path, seek=False)
+        try:
+            return reader.read(index)
+        finally:
+            reader.release()
+
+    def test_seek(self):
+        reader = FrameReader(self.path)
+        self.addCleanup(reader.release)
+        np.testing.assert_array_equal(reader.read(95), self.reference(95))
+        np.testing.assert_array_equal(reader.read(5), self.reference(5))
+        self.assertEqual(reader.stats()["decode_mode"], "seek")
+        self.assertEqual((reader.grabbed, reader.retrieved), (2, 2))
+
+    def test_sequential_reads_backwards(self):
+        reader = FrameReader(self.path, seek=False)
+        self.addCleanup(reader.release)
+        reader.read(50)
+        np.testing.assert_array_equal(reader.read(20), self.reference(20))
+        self.assertEqual(reader.position, 21)
+        self.assertEqual(reader.stats()["decode_mode"], "sequential")
+        self.assertEqual(reader.retrieved, 2)
+
+    def test_rejected_seek_falls_back(self):
+        reader = FrameReader(self.path)
+        self.addCleanup(reader.release)
+        reader.cap = RejectingCapture(reader.cap)
+        np.testing.assert_array_equal(reader.read(95), self.reference(95))
+        self.assertFalse(reader.seek)
+        self.assertEqual(reader.grabbed, 96)
+
+    def test_end_of_stream(self):
+        reader = FrameReader(self.path, seek=False)
+        self.addCleanup(reader.release)
+        self.assertIsNone(reader.read(12 * FPS))
+
+class SamplingTest(FrameTestCase):
+    def test_interval_indices(self):
+        self.assertEqual(list(self.tagger()._candidate_indices(10, 35, 5)), [0, 10, 20, 30])
+        self.assertEqual(list(self.tagger(interval=3)._candidate_indices(10, 100, 5)), [0, 30, 60, 90])
+        # Unknown length: indices continue until the reader runs out
+        self.assertEqual(list(islice(self.tagger()._candidate_indices(10, 0, 5), 4)), [0, 10, 20, 30])
+
+    def test_spread_indices(self):
+        tagger = self.tagger(strategy="spread")
+        self.assertEqual(list(tagger._candidate_indices(10, 100, 5)), [10, 30, 50, 70, 90])
+        # Unknown length: falls back to the interval
+        self.assertEqual(list(islice(tagger._candidate_indices(10, 0, 5), 2)), [0, 10])
+
+    def test_rejected_sample_replaced(self):
+        # The 0s sample is black; the next usable frame half a second later takes its place
+        path = self.clip("late.avi", [solid_frame(0)] * 5 + [textured_frame(0)] * 5 + [textured_frame(1)] * 10)
+        reader = FrameReader(path)
+        self.addCleanup(reader.release)
+        rejected = Counter()
+        indices = [index for index, _ in self.tagger()._sample_frames(reader, FPS, 20, 5, rejected)]
+        self.assertEqual(indices, [5, 10])
+        self.assertEqual(rejected, Counter(blank=1))
+
+    def test_scene_starts(self):
+        path = os.path.join(self.tmp.name, "scenes.avi")
+        starts = scene_clip(path, [1, 2, 3, 4], seconds=2)
+        reader = FrameReader(path)
+        self.addCleanup(reader.release)
+        scenes = self.tagger(strategy="scene")._scene_frames(reader, FPS, len(starts) * 2 * FPS, 5, Counter())
+        self.assertEqual([index for index, _ in scenes], starts)
+
+    def test_scene_keeps_strongest_cuts(self):
+        path = os.path.join(self.tmp.name, "scenes.avi")
+        scene_clip(path, range(8))
+        reader = FrameReader(path)
+        self.addCleanup(reader.release)
+        scenes = self.tagger(strategy="scene")._scene_frames(reader, FPS, 8 * FPS, 3, Counter())
+        indices = [index for index, _ in scenes]
+        self.assertEqual(len(indices), 3)
+        self.assertEqual(indices, sorted(indices))
+        self.assertIn(0, indices) # The opening frame scores highest
+
+class DecodeTest(FrameTestCase):
+    def test_dedup(self):
+        path = os.path.join(self.tmp.name, "repeat.avi")
+        scene_clip(path, [1, 1, 2]) # Identical first and second samples
+        stats = {}
+        frames, _ = self.tagger().decode_frames(path, stats=stats)
+        self.assertEqual((len(frames), stats["frames_deduplicated"]), (2, 1))
+        frames, _ = self.tagger(dedup_threshold=0).decode_frames(path)
+        self.assertEqual(len(frames), 3)
+
+    def test_stops_at_max_frames(self):
+        path = os.path.join(self.tmp.name, "long.avi")
+        scene_clip(path, range(30)) # Samples every 10 frames at interval=1, every 50 at interval=5
+        for seek, interval, grabbed in ((False, 1, 41), (True, 5, 5)):
+            with self.subTest(seek=seek):
+                stats = {}
+                frames, _ = self.tagger(seek=seek, interval=interval).decode_frames(path, stats=stats)
+                self.assertEqual(len(frames), 5)
+                self.assertEqual((stats["frames_retrieved"], stats["frames_grabbed"]), (5, grabbed))
+                self.assertEqual(stats["decode_mode"], "seek" if seek else "sequential")
+
+class FrameStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rng = np.random.default_rng(0)
+
+    def noise(self) -> np.ndarray:
+        # Incompressible, so each PNG weighs about 430 KiB
+        return self.rng.integers(0, 256, (384, 384, 3), dtype=np.uint8)
+
+    def test_round_trip(self):
+        store = FrameStore(self.tmp.name)
+        frames = [self.noise(), self.noise()]
+        store.save("100-abcdef", "s1", list(zip([0.0, 1.5], frames)), {"fps": 10}, {"frames_grabbed": 2})
+        loaded, metadata, stats = store.load("100-abcdef", "s1")
+        for frame, original in zip(loaded, frames):
+            np.testing.assert_array_equal(frame, original)
+        self.assertEqual((metadata, stats), ({"fps": 10}, {"frames_grabbed": 2}))
+        self.assertIsNone(store.load("100-abcdef", "s2"))
+        self.assertIsNone(store.load("100-012345", "s1"))
+
+    def test_evicts_least_recently_used(self):
+        store = FrameStore(self.tmp.name, max_mb=1)
+        for fingerprint in ("1-aa", "2-bb"):
+            store.save(fingerprint, "s", [(0.0, self.noise())], {}, {})
+        # a is older than b, until it is read again
+        for fingerprint, mtime in (("1-aa", 1000), ("2-bb", 2000)):
+            os.utime(os.path.join(store.video_dir(fingerprint), "manifest-s.json"), (mtime, mtime))
+        self.assertIsNotNone(store.load("1-aa", "s"))
+
+        store.save("3-cc", "s", [(0.0, self.noise())], {}, {})
+        self.assertIsNone(store.load("2-bb", "s"))
+        self.assertFalse(os.path.exists(store.video_dir("2-bb")))
+        self.assertIsNotNone(store.load("1-aa", "s"))
+        self.assertIsNotNone(store.load("3-cc", "s"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Tests for TaggingPipeline's duplicate handling, on synthetic clips with the engine stubbed out.
+
+    python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import bo_video_tagger  # noqa: E402
+from bo_video_tagger import DESCRIPTION_KEY, DuplicateIndex, ResultCache, VideoTagger  # noqa: E402
+from clips import scene_clip  # noqa: E402
+
+class StubTagger(VideoTagger):
+    """VideoTagger whose engine answers with a numbered description, counting calls."""
+
+    def __init__(self, state_dir: str, infer_delay: float = 0.0, **kwargs):
+        super().__init__(interval=1, frame_store_mb=0, **kwargs)
+        self.result_cache = ResultCache(os.path.join(state_dir, "results.sqlite3"))
+        self.duplicate_index = DuplicateIndex(os.path.join(state_dir, "duplicates.sqlite3"))
+        self.llm = object() # Only checked for presence; describe_frames is replaced
+        self.infer_delay = infer_delay
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def describe_frames(self, frames):
+        time.sleep(self.infer_delay)
+        with self._calls_lock:
+            self.calls += 1
+            n = self.calls
+        return {DESCRIPTION_KEY: f"Answer number {n} about a harbour scene."}, {
+            "inference_time_sec": 0.0, "prompt_tokens": 0, "prompt_tokens_cached": 0
+        }
+
+class DuplicatePipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.vids = os.path.join(self.tmp.name, "vids")
+        os.makedirs(self.vids)
+        self.a = self.clip("a.avi", range(5))
+        self.copy = os.path.join(self.vids, "a_copy.avi")
+        shutil.copyfile(self.a, self.copy)
+        self.reenc = self.clip("a_reenc.avi", range(5), brightness=6)
+        self.b = self.clip("b.avi", range(10, 15))
+
+    def clip(self, name: str, seeds, brightness: int = 0, root: str = None) -> str:
+        path = os.path.join(root or self.vids, name)
+        scene_clip(path, seeds, brightness=brightness)
+        return path
+
+    def tagger(self, **kwargs) -> StubTagger:
+        tagger = StubTagger(self.tmp.name, **kwargs)
+        self.addCleanup(tagger.close)
+        return tagger
+
+    def run_tagger(self, tagger: StubTagger, paths) -> dict:
+        # One decoder, so the first video listed is the one that becomes canonical
+        return {path: result for path, result in zip(paths, tagger.process_videos(paths, decode_workers=1))}
+
+    def test_duplicates_reuse_canonical(self):
+        tagger = self.tagger(find_duplicates=True)
+        results = self.run_tagger(tagger, [self.a, self.copy, self.reenc, self.b])
+        self.assertEqual(tagger.calls, 2)
+        self.assertNotIn("duplicate_of", results[self.a]["meta"])
+        self.assertNotIn("duplicate_of", results[self.b]["meta"])
+        for path in (self.copy, self.reenc):
+            self.assertEqual(results[path]["meta"]["duplicate_of"], self.a)
+            self.assertEqual(results[path]["meta"]["path"], path)
+            self.assertEqual(results[path]["ai"], results[self.a]["ai"])
+
+    def test_held_until_canonical_finishes(self):
+        # Inference is slow enough that the re-encode reaches the duplicates stage first
+        for cache in (True, False):
+            with self.subTest(cache=cache):
+                tagger = self.tagger(find_duplicates=True, cache=cache, infer_delay=0.5)
+                results = self.run_tagger(tagger, [self.a, self.reenc])
+                self.assertEqual(tagger.calls, 1)
+                self.assertEqual(results[self.reenc]["meta"]["duplicate_of"], self.a)
+                self.assertEqual(results[self.reenc]["ai"], results[self.a]["ai"])
+                tagger.close()
+                os.remove(os.path.join(self.tmp.name, "duplicates.sqlite3"))
+                os.remove(os.path.join(self.tmp.name, "results.sqlite3"))
+
+    def test_exact_copy_from_cache(self):
+        self.run_tagger(self.tagger(find_duplicates=True), [self.a])
+        tagger = self.tagger(find_duplicates=True)
+        result = self.run_tagger(tagger, [self.copy])[self.copy]
+        self.assertEqual(tagger.calls, 0)
+        self.assertTrue(result["system"]["cache_hit"])
+        self.assertEqual(result["meta"]["duplicate_of"], self.a)
+
+    def test_duplicate_results_not_cached(self):
+        self.run_tagger(self.tagger(find_duplicates=True), [self.a, self.reenc])
+        tagger = self.tagger()
+        result = self.run_tagger(tagger, [self.reenc])[self.reenc]
+        self.assertEqual(tagger.calls, 1)
+        self.assertFalse(result["system"]["cache_hit"])
+        self.assertNotIn("duplicate_of", result["meta"])
+
+    def test_relative_paths_across_working_directories(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        w1, w2 = os.path.join(self.tmp.name, "w1"), os.path.join(self.tmp.name, "w2")
+        for root, seeds in ((w1, range(5)), (w2, range(20, 25))):
+            os.makedirs(os.path.join(root, "vids"))
+            self.clip("a.avi", seeds, root=os.path.join(root, "vids"))
+        shutil.copyfile(os.path.join(w1, "vids", "a.avi"), os.path.join(w1, "vids", "a_copy.avi"))
+
+        os.chdir(w1)
+        first = self.run_tagger(self.tagger(find_duplicates=True), ["vids/a.avi"])["vids/a.avi"]
+        os.chdir(w2)
+        self.run_tagger(self.tagger(find_duplicates=True), ["vids/a.avi"])
+        os.chdir(w1)
+        tagger = self.tagger(find_duplicates=True)
+        result = self.run_tagger(tagger, ["vids/a_copy.avi"])["vids/a_copy.avi"]
+        self.assertEqual(result["meta"]["duplicate_of"], os.path.join(os.path.realpath(w1), "vids", "a.avi"))
+        self.assertEqual(result["ai"], first["ai"])
+
+class AsyncApiTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.vids = os.path.join(self.tmp.name, "vids")
+        os.makedirs(self.vids)
+        self.paths = []
+        for i in range(3):
+            self.paths.append(os.path.join(self.vids, f"v{i}.avi"))
+            scene_clip(self.paths[-1], range(10 * i, 10 * i + 3))
+        self.tagger = StubTagger(self.tmp.name, infer_delay=0.05)
+        self.tagger.async_concurrency = 1 # Every other video waits on the semaphore
+        self.tagger.use_cache = False # Every run infers again
+        self.addCleanup(self.tagger.close)
+
+    async def process_all(self) -> list:
+        return await asyncio.gather(*(self.tagger.aprocess_video(path) for path in self.paths))
+
+    def test_successive_event_loops(self):
+        for run in range(2):
+            with self.subTest(run=run):
+                results = asyncio.run(self.process_all())
+                self.assertEqual([result["meta"]["path"] for result in results], self.paths)
+        self.assertEqual(self.tagger.calls, 6)
+
+    def test_folder_listed_off_the_event_loop(self):
+        listed_on, original = [], bo_video_tagger.find_videos
+
+        def find_videos(folder):
+            listed_on.append(threading.current_thread())
+            return original(folder)
+
+        async def collect():
+            return [result async for result in self.tagger.aprocess_folder(self.vids)]
+
+        with mock.patch.object(bo_video_tagger, "find_videos", find_videos):
+            results = asyncio.run(collect())
+        self.assertEqual(sorted(result["meta"]["path"] for result in results), self.paths)
+        self.assertNotEqual(listed_on, [threading.main_thread()])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for scan_completed(), which --resume uses to skip tagged videos.
+
+    python -m unittest discover -s tests
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bo_video_tagger import scan_completed  # noqa: E402
+
+def result_line(path: str) -> bytes:
+    # Same layout as write_results()
+    return (json.dumps({"meta": {"file": os.path.basename(path), "path": path}, "ai": {}}) + "\n").encode()
+
+class ScanCompletedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "out.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def scan(self, data: bytes):
+        with open(self.output, 'wb') as f:
+            f.write(data)
+        return scan_completed(self.output)
+
+    def test_collects_paths(self):
+        data = result_line("/videos/a.mp4") + result_line("/videos/b.mp4")
+        self.assertEqual(self.scan(data), ({"/videos/a.mp4", "/videos/b.mp4"}, len(data)))
+
+    def test_truncated_last_line(self):
+        complete = result_line("/videos/a.mp4")
+        completed, size = self.scan(complete + result_line("/videos/b.mp4")[:-10])
+        self.assertEqual(completed, {"/videos/a.mp4"})
+        self.assertEqual(size, len(complete))
+
+    def test_last_line_without_newline(self):
+        complete = result_line("/videos/a.mp4")
+        completed, size = self.scan(complete + result_line("/videos/b.mp4").rstrip(b"\n"))
+        self.assertEqual(completed, {"/videos/a.mp4"})
+        self.assertEqual(size, len(complete))
+
+    def test_escaped_paths(self):
+        paths = ['/videos/say "hi".mp4', "/videos/back\\slash.mp4", "/videos/café ☕.mp4"]
+        completed, _ = self.scan(b"".join(result_line(path) for path in paths))
+        self.assertEqual(completed, set(paths))
+
+    def test_skips_errors(self):
+        # Same layout as VideoTagger._error_result()
+        error = (json.dumps({"meta": {"file": "c.mp4"}, "error": "Could not open video"}) + "\n").encode()
+        data = result_line("/videos/a.mp4") + error + b"not json\n" + b"[1, 2]\n"
+        self.assertEqual(self.scan(data), ({"/videos/a.mp4"}, len(data)))
+
+    def test_json_fallback(self):
+        # Key order the fast path does not match
+        line = (json.dumps({"ai": {}, "meta": {"path": "/videos/a.mp4", "file": "a.mp4"}}) + "\n").encode()
+        self.assertEqual(self.scan(line)[0], {"/videos/a.mp4"})
+
+    def test_relative_paths_made_absolute(self):
+        self.assertEqual(self.scan(result_line("a.mp4"))[0], {os.path.abspath("a.mp4")})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tiny random-weight GGUF models with SmolVLM2's layout (llama text model, idefics3 projector).
+
+They load and run through the same llama.cpp code paths as the real models in
+well under a second, so the engine can be smoke-tested without downloading
+them. Answers are noise. Needs the `gguf` package.
+"""
+import os
+
+import numpy as np
+
+TEXT_EMBD = 64
+VISION_EMBD = 32
+IMAGE_SIZE = 32
+PATCH_SIZE = 8
+SCALE_FACTOR = 2
+
+def _weights(rng: np.random.Generator, *shape: int) -> np.ndarray:
+    return (rng.standard_normal(shape) * 0.05).astype(np.float32)
+
+def _byte_vocab() -> tuple:
+    """SentencePiece vocab of control tokens plus byte fallback, which covers any text."""
+    tokens = ["<unk>", "<s>", "</s>"] + [f"<0x{i:02X}>" for i in range(256)]
+    types = [2, 3, 3] + [6] * 256 # unknown, control, byte
+    return tokens, [0.0] * len(tokens), types
+
+def write_text_model(path: str, seed: int = 0):
+    import gguf
+
+    rng = np.random.default_rng(seed)
+    tokens, scores, types = _byte_vocab()
+    writer = gguf.GGUFWriter(path, "llama")
+    writer.add_tokenizer_model("llama")
+    writer.add_token_list(tokens)
+    writer.add_token_scores(scores)
+    writer.add_token_types(types)
+    writer.add_unk_token_id(0)
+    writer.add_bos_token_id(1)
+    writer.add_eos_token_id(2)
+    writer.add_context_length(4096)
+    writer.add_embedding_length(TEXT_EMBD)
+    writer.add_block_count(1)
+    writer.add_feed_forward_length(2 * TEXT_EMBD)
+    writer.add_head_count(4)
+    writer.add_head_count_kv(4)
+    writer.add_rope_dimension_count(TEXT_EMBD // 4)
+    writer.add_layer_norm_rms_eps(1e-5)
+    writer.add_file_type(gguf.LlamaFileType.ALL_F32)
+
+    writer.add_tensor("token_embd.weight", _weights(rng, len(tokens), TEXT_EMBD))
+    writer.add_tensor("output_norm.weight", np.ones(TEXT_EMBD, np.float32))
+    writer.add_tensor("output.weight", _weights(rng, len(tokens), TEXT_EMBD))
+    writer.add_tensor("blk.0.attn_norm.weight", np.ones(TEXT_EMBD, np.float32))
+    for name in ("attn_q", "attn_k", "attn_v", "attn_output"):
+        writer.add_tensor(f"blk.0.{name}.weight", _weights(rng, TEXT_EMBD, TEXT_EMBD))
+    writer.add_tensor("blk.0.ffn_norm.weight", np.ones(TEXT_EMBD, np.float32))
+    writer.add_tensor("blk.0.ffn_gate.weight", _weights(rng, 2 * TEXT_EMBD, TEXT_EMBD))
+    writer.add_tensor("blk.0.ffn_up.weight", _weights(rng, 2 * TEXT_EMBD, TEXT_EMBD))
+    writer.add_tensor("blk.0.ffn_down.weight", _weights(rng, TEXT_EMBD, 2 * TEXT_EMBD))
+    _finish(writer)
+
+def write_projector(path: str, seed: int = 0):
+    import gguf
+
+    rng = np.random.default_rng(seed)
+    e, ff = VISION_EMBD, 2 * VISION_EMBD
+    writer = gguf.GGUFWriter(path, "clip")
+    writer.add_string("clip.projector_type", "idefics3")
+    writer.add_bool("clip.has_vision_encoder", True)
+    writer.add_bool("clip.use_gelu", True)
+    writer.add_uint32("clip.vision.embedding_length", e)
+    writer.add_uint32("clip.vision.feed_forward_length", ff)
+    writer.add_uint32("clip.vision.block_count", 1)
+    writer.add_uint32("clip.vision.projection_dim", TEXT_EMBD)
+    writer.add_uint32("clip.vision.attention.head_count", 2)
+    writer.add_float32("clip.vision.attention.layer_norm_epsilon", 1e-6)
+    writer.add_uint32("clip.vision.image_size", IMAGE_SIZE)
+    writer.add_uint32("clip.vision.patch_size", PATCH_SIZE)
+    writer.add_array("clip.vision.image_mean", [0.5, 0.5, 0.5])
+    writer.add_array("clip.vision.image_std", [0.5, 0.5, 0.5])
+    writer.add_uint32("clip.vision.projector.scale_factor", SCALE_FACTOR)
+
+    writer.add_tensor("v.patch_embd.weight", _weights(rng, e, 3, PATCH_SIZE, PATCH_SIZE))
+    writer.add_tensor("v.patch_embd.bias", np.zeros(e, np.float32))
+    writer.add_tensor("v.position_embd.weight", _weights(rng, (IMAGE_SIZE // PATCH_SIZE) ** 2, e))
+    for name in ("attn_q", "attn_k", "attn_v", "attn_out"):
+        writer.add_tensor(f"v.blk.0.{name}.weight", _weights(rng, e, e))
+        writer.add_tensor(f"v.blk.0.{name}.bias", np.zeros(e, np.float32))
+    for name in ("ln1", "ln2", "post_ln"):
+        prefix = "v." if name == "post_ln" else "v.blk.0."
+        writer.add_tensor(f"{prefix}{name}.weight", np.ones(e, np.float32))
+        writer.add_tensor(f"{prefix}{name}.bias", np.zeros(e, np.float32))
+    writer.add_tensor("v.blk.0.ffn_up.weight", _weights(rng, ff, e))
+    writer.add_tensor("v.blk.0.ffn_up.bias", np.zeros(ff, np.float32))
+    writer.add_tensor("v.blk.0.ffn_down.weight", _weights(rng, e, ff))
+    writer.add_tensor("v.blk.0.ffn_down.bias", np.zeros(e, np.float32))
+    writer.add_tensor("mm.model.fc.weight", _weights(rng, TEXT_EMBD, e * SCALE_FACTOR ** 2))
+    _finish(writer)
+
+def _finish(writer):
+    writer.write_header_to_file()
+    writer.write_kv_data_to_file()
+    writer.write_tensors_to_file()
+    writer.close()
+
+def write_models(root: str, model_name: str, mmproj_name: str):
+    write_text_model(os.path.join(root, model_name))
+    write_projector(os.path.join(root, mmproj_name))